@@ -0,0 +1,24 @@
+"""Compiled source-scanning patterns shared by the metrics scripts."""
+import re
+
+
+# Sources and Makefiles are ASCII, so they are scanned as bytes with no decode step.
+PRECONDITION_LITERALS = (b"__CPROVER_precondition", b"CBMC_PRECONDITION", b"__CPROVER_assume")
+PRECONDITION_PAT_BYTES = re.compile(b"|".join(PRECONDITION_LITERALS))
+UNWINDSET_RE = re.compile(rb"--unwindset\s+\S+:(\d+)")
+UNWIND_RE = re.compile(rb"--unwind\s+(\d+)")
+
+# C function definitions in brace-depth-0 text: optional return type/qualifiers,
+# then name(params), optional K&R parameter declarations, then {.
+FUNC_DEF_RE = re.compile(
+    r"^(?:[A-Za-z_][\w\s\*]*?[\s\*])?([A-Za-z_]\w*)\s*\([^;{}]*\)"
+    r"(?:\s*[A-Za-z_][\w\s\*,\[\]]*;)*\s*\{",
+    re.M,
+)
+# String and char literals, comments and preprocessor lines, in one pass so a
+# "/*" inside a literal does not open a comment.
+C_NOISE_RE = re.compile(
+    r'"(?:\\.|[^"\\\n])*"|\'(?:\\.|[^\'\\\n])*\'|/\*.*?\*/|//[^\n]*|^[ \t]*#(?:\\\n|[^\n])*',
+    re.S | re.M,
+)
+C_BRACE_RE = re.compile(r"[{}]")
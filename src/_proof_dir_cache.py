@@ -0,0 +1,551 @@
+"""Proof-dir metrics shared by paper_metrics.py and up_quality_metrics.py.
+
+With CODEXUP_PROOF_CACHE=1 the summaries are kept in
+<run_root>/.codexup_cache.json and reused while the Makefile, the coverage
+and result reports and the in-scope sources are unchanged.
+"""
+import errno
+import functools
+import json
+import mmap
+import os
+import re
+import shutil
+import stat
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from _patterns import (
+    C_BRACE_RE,
+    C_NOISE_RE,
+    FUNC_DEF_RE,
+    PRECONDITION_LITERALS,
+    PRECONDITION_PAT_BYTES,
+    UNWIND_RE,
+    UNWINDSET_RE,
+)
+
+
+CACHE_FILE_NAME = ".codexup_cache.json"
+# Bump when ProofSummary or the way it is computed changes.
+_CACHE_VERSION = 2
+
+_PRECONDITION_SCAN_WORKERS = 8
+# Files at least this large (generated sources, mostly) are scanned through
+# mmap instead of being read into memory.
+_MMAP_MIN_BYTES = 1 << 20
+
+# Control-flow keywords a column-0 "if (...) {" would otherwise match as a name.
+_C_KEYWORDS = frozenset({"if", "else", "for", "while", "switch", "do", "return", "sizeof"})
+# Line statuses in viewer-coverage.json that count as covered.
+_HIT_STATES = frozenset({"hit", "covered", "both", "1", "true"})
+_HARNESS_SUFFIX = "_harness.c"
+# errnos Path.exists() reports as "does not exist".
+_MISSING_ERRNOS = frozenset({errno.ENOENT, errno.ENOTDIR, errno.EBADF, errno.ELOOP})
+# Common viewer-coverage.json status spellings, pre-classified for summarize_coverage.
+_STATUS_BITS = {
+    status: int(status.lower() in _HIT_STATES)
+    for status in ("hit", "covered", "both", "1", "true", "miss", "missed", "none", "0", "false")
+}
+
+
+@dataclass(frozen=True)
+class ProofSummary:
+    num_preconditions: int
+    stubs: int
+    custom_loop_limits: Optional[int]
+    max_loop_limit: Optional[int]
+    compile_success: bool
+    coverage_hit: Optional[int]
+    coverage_total: Optional[int]
+    harness_size: Optional[int]
+    program_files: Optional[int]
+    verification_error_count: Optional[int]
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with path.open("r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return None
+
+
+def _safe_read_text(path: Path) -> str:
+    try:
+        return path.read_text(encoding="utf-8", errors="ignore")
+    except Exception:
+        return ""
+
+
+@contextmanager
+def _source_buffer(path: Path) -> Iterator[Union[bytes, mmap.mmap]]:
+    """Raw file contents for a bytes regex: read for small files, mmap for large ones."""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size < _MMAP_MIN_BYTES:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+
+def _walk_leaf_sources(proof_dir: Path) -> List[Tuple[str, str]]:
+    """(path, resolved path) of entries rglob("*.c") then rglob("*.h") would yield.
+
+    One os.scandir walk replaces the two rglob passes, and the resolved path
+    is built from the root's realpath instead of resolving every entry;
+    only symlinks need their own realpath. Like rglob, symlinked
+    directories are not descended into.
+    """
+    root = str(proof_dir)
+    root_len = len(root.rstrip("/"))
+    real_prefix = os.path.realpath(root).rstrip("/")
+    c_files: List[Tuple[str, str]] = []
+    h_files: List[Tuple[str, str]] = []
+    stack = [root]
+    while stack:
+        top = stack.pop()
+        subdirs: List[str] = []
+        try:
+            with os.scandir(top) as it:
+                for entry in it:
+                    name = entry.name
+                    if name.endswith(".c"):
+                        bucket: Optional[List[Tuple[str, str]]] = c_files
+                    elif name.endswith(".h"):
+                        bucket = h_files
+                    else:
+                        bucket = None
+                    try:
+                        is_symlink = entry.is_symlink()
+                        if not is_symlink and entry.is_dir():
+                            subdirs.append(entry.path)
+                    except OSError:
+                        is_symlink = False
+                    if bucket is not None:
+                        path = entry.path
+                        if is_symlink:
+                            real = os.path.realpath(path)
+                        else:
+                            real = real_prefix + path[root_len:]
+                        bucket.append((path, real))
+        except OSError:
+            continue
+        # Pre-order, in scandir order, matching rglob.
+        stack.extend(reversed(subdirs))
+    return c_files + h_files
+
+
+def _parent_stub_sources(parent: Path) -> List[Tuple[str, str]]:
+    """(path, resolved path) of stub/model sources directly in the proof's parent dir.
+
+    DirEntry.is_file() answers from the directory listing for regular
+    files, so only symlinks are stat'ed.
+    """
+    root = str(parent)
+    real_prefix = os.path.realpath(root).rstrip("/")
+    out: List[Tuple[str, str]] = []
+    try:
+        with os.scandir(root) as it:
+            for entry in it:
+                try:
+                    if not entry.is_file():
+                        continue
+                    is_symlink = entry.is_symlink()
+                except OSError:
+                    continue
+                n = entry.name.lower()
+                # Same test as Path.suffix: a bare ".c" has no suffix.
+                if os.path.splitext(n)[1] not in (".c", ".h"):
+                    continue
+                if n == "general-stubs.c" or "stub" in n or "model" in n:
+                    path = entry.path
+                    real = os.path.realpath(path) if is_symlink else f"{real_prefix}/{entry.name}"
+                    out.append((path, real))
+    except OSError:
+        pass
+    return out
+
+
+def gather_scope_files(proof_dir: Path) -> List[Path]:
+    leaf = _walk_leaf_sources(proof_dir)
+
+    seen = set()
+    out: List[Path] = []
+    for path, rp in leaf + _parent_stub_sources(proof_dir.parent):
+        if rp not in seen:
+            seen.add(rp)
+            out.append(Path(path))
+    return out
+
+
+def coverage_path_from_proof_dir(proof_dir: Path) -> Path:
+    return proof_dir / "build" / "report" / "json" / "viewer-coverage.json"
+
+
+def verification_path_from_proof_dir(proof_dir: Path) -> Path:
+    return proof_dir / "build" / "report" / "json" / "viewer-result.json"
+
+
+def _read_coverage_report(coverage_path: Path) -> Tuple[Optional[Dict[str, Any]], bool]:
+    """Coverage mapping (None if unreadable or malformed) and whether the report exists.
+
+    The existence answer comes from the same open() as the parse, so the
+    caller needs no separate exists() stat.
+    """
+    try:
+        with coverage_path.open("r", encoding="utf-8") as f:
+            data = json.load(f)
+    except OSError as exc:
+        return None, exc.errno not in _MISSING_ERRNOS
+    except Exception:
+        return None, True
+    if not isinstance(data, dict):
+        return None, True
+
+    viewer = data.get("viewer-coverage", {})
+    coverage = viewer.get("coverage", {})
+    if not isinstance(coverage, dict):
+        return None, True
+    return coverage, True
+
+
+def load_coverage(coverage_path: Path) -> Optional[Dict[str, Any]]:
+    """Parsed viewer-coverage "coverage" mapping, or None if missing or malformed."""
+    return _read_coverage_report(coverage_path)[0]
+
+
+def summarize_coverage(
+    coverage: Optional[Dict[str, Any]],
+) -> Tuple[Optional[int], Optional[int], Optional[int], Optional[int]]:
+    """(non-harness hit, non-harness total, harness size, program files) in one pass."""
+    if coverage is None:
+        return None, None, None, None
+
+    hit = 0
+    total = 0
+    harness_size = 0
+    program_files = 0
+    # Status string -> 1 if covered else 0, grown as new spellings show up.
+    bits = dict(_STATUS_BITS)
+    bit_of = bits.__getitem__
+    # JSON object keys are always str, so no str() round-trip is needed.
+    for file_path, funcs in coverage.items():
+        is_harness = file_path.endswith(_HARNESS_SUFFIX)
+        if not is_harness:
+            program_files += 1
+        if not isinstance(funcs, dict):
+            continue
+        for _func, lines in funcs.items():
+            if not isinstance(lines, dict):
+                continue
+            if is_harness:
+                harness_size += len(lines)
+                continue
+            statuses = lines.values()
+            total += len(lines)
+            try:
+                # Known string statuses: the whole function is summed in C.
+                hit += sum(map(bit_of, statuses))
+            except (KeyError, TypeError):
+                hit += _classify_statuses(statuses, bits)
+    return hit, total, harness_size, program_files
+
+
+def _classify_statuses(statuses: Iterable[Any], bits: Dict[str, int]) -> int:
+    """Hits among statuses, adding unseen strings to `bits`.
+
+    Same result as `str(status).lower() in _HIT_STATES`: the only covered
+    non-string JSON values are true and 1.
+    """
+    hits = 0
+    for status in statuses:
+        if type(status) is str:
+            bit = bits.get(status)
+            if bit is None:
+                bit = bits[status] = int(status.lower() in _HIT_STATES)
+            hits += bit
+        elif status is True or (type(status) is int and status == 1):
+            hits += 1
+    return hits
+
+
+def parse_loop_limits(proof_dir: Path) -> Tuple[Optional[int], Optional[int]]:
+    """(number of --unwindset limits, largest --unwindset/--unwind bound) from the Makefile."""
+    makefile = proof_dir / "Makefile"
+    unwindset_limits = []
+    unwind_limits = []
+    try:
+        with _source_buffer(makefile) as text:
+            for match in UNWINDSET_RE.finditer(text):
+                try:
+                    unwindset_limits.append(int(match.group(1)))
+                except Exception:
+                    continue
+
+            for match in UNWIND_RE.finditer(text):
+                try:
+                    unwind_limits.append(int(match.group(1)))
+                except Exception:
+                    continue
+    except Exception:
+        return None, None
+
+    max_limit = None
+    if unwindset_limits or unwind_limits:
+        max_limit = max(unwindset_limits + unwind_limits)
+    return len(unwindset_limits), max_limit
+
+
+@functools.lru_cache(maxsize=4096)
+def _cached_precondition_count(path: str, _mtime_ns: int, _size: int) -> int:
+    # mtime and size are part of the key so an edited file is scanned again.
+    try:
+        with _source_buffer(Path(path)) as text:
+            if isinstance(text, bytes):
+                # No literal can overlap itself or another, so per-literal
+                # counts add up to the regex match count.
+                return sum(map(text.count, PRECONDITION_LITERALS))
+            return len(PRECONDITION_PAT_BYTES.findall(text))
+    except (OSError, ValueError):
+        return 0
+
+
+def _file_precondition_count(path: Path) -> int:
+    """Precondition matches in one file, memoized per (path, mtime, size).
+
+    Parent-dir stubs and models are in scope for every proof next to them,
+    so most of them are scanned once per process instead of once per row.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return 0
+    # Empty stubs and directories named *.c can't match; skip opening them.
+    if not st.st_size or not stat.S_ISREG(st.st_mode):
+        return 0
+    return _cached_precondition_count(str(path), st.st_mtime_ns, st.st_size)
+
+
+def count_preconditions(files: List[Path]) -> int:
+    # Reads dominate on network or cold filesystems; overlap them with a few threads.
+    if len(files) <= _PRECONDITION_SCAN_WORKERS:
+        return sum(map(_file_precondition_count, files))
+    with ThreadPoolExecutor(max_workers=_PRECONDITION_SCAN_WORKERS) as pool:
+        return sum(pool.map(_file_precondition_count, files))
+
+
+@functools.lru_cache(maxsize=1)
+def _ctags_bin() -> Optional[str]:
+    return shutil.which("ctags")
+
+
+def _ctags_function_names(harness_files: List[Path]) -> Optional[List[str]]:
+    """Function names from one ctags -x run, or None if ctags is missing or fails."""
+    ctags = _ctags_bin()
+    if ctags is None:
+        return None
+    try:
+        result = subprocess.run(
+            [ctags, "-x", "--c-kinds=f", *map(str, harness_files)],
+            capture_output=True,
+            text=True,
+            check=False,
+        )
+    except Exception:
+        return None
+    if result.returncode != 0:
+        return None
+    return [line.split()[0] for line in result.stdout.splitlines() if line.strip()]
+
+
+def _blank_c_noise(match: re.Match) -> str:
+    token = match.group()
+    if token[0] == '"':
+        return '""'
+    if token[0] == "'":
+        return "''"
+    if token[0] == "/":
+        return "\n" if "\n" in token else " "
+    return ""
+
+
+def _top_level_text(text: str) -> str:
+    """`text` with the contents of every brace block removed ("{...}" -> "{}")."""
+    parts = []
+    depth = 0
+    start = 0
+    for match in C_BRACE_RE.finditer(text):
+        if match.group() == "{":
+            if depth == 0:
+                parts.append(text[start:match.end()])
+            depth += 1
+        elif depth:
+            depth -= 1
+            if depth == 0:
+                start = match.start()
+    if depth == 0:
+        parts.append(text[start:])
+    return "".join(parts)
+
+
+def _regex_function_names(path: Path) -> List[str]:
+    """Function definitions found without ctags; statements in bodies never match."""
+    text = _top_level_text(C_NOISE_RE.sub(_blank_c_noise, _safe_read_text(path)))
+    return [name for name in FUNC_DEF_RE.findall(text) if name not in _C_KEYWORDS]
+
+
+def count_harness_stub_functions(proof_dir: Path) -> int:
+    harness_files = list(proof_dir.rglob("*_harness.c"))
+    if not harness_files:
+        return 0
+
+    # ctags is the reference; the regex scan only stands in when it is unavailable.
+    names = _ctags_function_names(harness_files)
+    if names is None:
+        names = [name for path in harness_files for name in _regex_function_names(path)]
+    total = 0
+    for name in names:
+        if name == "harness":
+            continue
+        if name.startswith("__CPROVER_nondet_"):
+            continue
+        if name.startswith("_assert_") or name.startswith("__assert_"):
+            continue
+        total += 1
+    return total
+
+
+def read_verification_error_count(proof_dir: Path) -> Optional[int]:
+    result_path = verification_path_from_proof_dir(proof_dir)
+    data = _read_json(result_path)
+    if not isinstance(data, dict):
+        return None
+    result = data.get("viewer-result", {})
+    if not isinstance(result, dict):
+        return None
+    results = result.get("results", {})
+    if not isinstance(results, dict):
+        return None
+    false_list = results.get("false", [])
+    if not isinstance(false_list, list):
+        false_list = []
+    return len(false_list)
+
+
+def _summarize(proof_dir: Path, scope: List[Path]) -> ProofSummary:
+    coverage, compile_success = _read_coverage_report(coverage_path_from_proof_dir(proof_dir))
+    cov_hit, cov_total, harness_size, program_files = summarize_coverage(coverage)
+    custom_loop_limits, max_loop_limit = parse_loop_limits(proof_dir)
+    scope_c = [p for p in scope if p.suffix.lower() == ".c"]
+    return ProofSummary(
+        num_preconditions=count_preconditions(scope_c) if scope_c else 0,
+        stubs=count_harness_stub_functions(proof_dir),
+        custom_loop_limits=custom_loop_limits,
+        max_loop_limit=max_loop_limit,
+        compile_success=compile_success,
+        coverage_hit=cov_hit,
+        coverage_total=cov_total,
+        harness_size=harness_size,
+        program_files=program_files,
+        verification_error_count=read_verification_error_count(proof_dir),
+    )
+
+
+def summarize_proof_dir(proof_dir: Path) -> ProofSummary:
+    return _summarize(proof_dir, gather_scope_files(proof_dir))
+
+
+def _stamp(proof_dir: Path, scope: List[Path]) -> List[List[Any]]:
+    """(path, mtime_ns, size) for every input a ProofSummary is derived from."""
+    inputs = [
+        proof_dir / "Makefile",
+        coverage_path_from_proof_dir(proof_dir),
+        verification_path_from_proof_dir(proof_dir),
+        *scope,
+    ]
+    stamp: List[List[Any]] = []
+    for path in inputs:
+        try:
+            st = os.stat(path)
+        except OSError:
+            stamp.append([str(path), None, None])
+        else:
+            stamp.append([str(path), st.st_mtime_ns, st.st_size])
+    return stamp
+
+
+def summarize_proof_dir_cached(
+    proof_dir: Path, entry: Optional[Dict[str, Any]]
+) -> Tuple[ProofSummary, Dict[str, Any]]:
+    """Reuse a cache entry whose stamp still matches, else recompute.
+
+    Returns the summary and the entry to store. Kept separate from
+    ProofSummaryCache so process-pool workers can call it with plain data.
+    """
+    scope = gather_scope_files(proof_dir)
+    stamp = _stamp(proof_dir, scope)
+    if entry is not None and entry.get("stamp") == stamp:
+        try:
+            return ProofSummary(**entry["summary"]), entry
+        except (KeyError, TypeError):
+            pass
+    summary = _summarize(proof_dir, scope)
+    return summary, {"stamp": stamp, "summary": asdict(summary)}
+
+
+def _cache_version() -> List[Any]:
+    """Cache format plus the stub counter in use; ctags and the regex scan can disagree."""
+    return [_CACHE_VERSION, "ctags" if _ctags_bin() else "regex"]
+
+
+class ProofSummaryCache:
+    """Opt-in (CODEXUP_PROOF_CACHE=1) on-disk cache of ProofSummary per proof dir."""
+
+    def __init__(self, run_root: Path) -> None:
+        self.path = run_root / CACHE_FILE_NAME
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.dirty = False
+        data = _read_json(self.path)
+        if isinstance(data, dict) and data.get("version") == _cache_version():
+            entries = data.get("entries")
+            if isinstance(entries, dict):
+                self.entries = entries
+
+    @staticmethod
+    def enabled() -> bool:
+        return os.getenv("CODEXUP_PROOF_CACHE") == "1"
+
+    def get(self, proof_dir: Path) -> Optional[Dict[str, Any]]:
+        return self.entries.get(str(proof_dir))
+
+    def put(self, proof_dir: Path, entry: Dict[str, Any]) -> None:
+        if self.entries.get(str(proof_dir)) != entry:
+            self.entries[str(proof_dir)] = entry
+            self.dirty = True
+
+    def summarize(self, proof_dir: Path) -> ProofSummary:
+        summary, entry = summarize_proof_dir_cached(proof_dir, self.get(proof_dir))
+        self.put(proof_dir, entry)
+        return summary
+
+    def save(self) -> None:
+        """Write the cache next to the proof dirs (best effort)."""
+        if not self.dirty:
+            return
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"version": _cache_version(), "entries": self.entries}, f)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+        except OSError:
+            # Read-only run roots just skip caching.
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
@@ -1,24 +1,60 @@
 #!/usr/bin/env python3
 import argparse
+import asyncio
+import functools
+import mmap
+import multiprocessing
 import os
+import queue
 import re
 import shutil
-import subprocess
+import string
 import sys
 import json
 import threading
 import time
 import uuid
 from pathlib import Path
-from typing import Dict, Any, Optional, Tuple
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
 
 try:
     import yaml  # type: ignore
 except Exception:
     yaml = None
 
-from metrics_summary import summarize_metrics
+# Prefer the LibYAML-backed loader when PyYAML was built with it.
+_YamlLoader = getattr(yaml, "CSafeLoader", None) or getattr(yaml, "SafeLoader", None)
+
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
+from metrics_summary import MetricsAccumulator
+
+
+# Resolved once by main() so each Popen skips the PATH search.
+_CODEX_BIN = "codex"
+# Prompt placeholders and the optional examples section.
+_K_FUNCTION_NAME = "FUNCTION_NAME"
+_K_TARGET_FILE = "TARGET_FILE"
+_K_PROOF_DIR = "PROOF_DIR"
+_K_MAKEFILE_INCLUDE = "MAKEFILE_INCLUDE"
+_K_EXAMPLES_DIR = "EXAMPLES_DIR"
+_K_LOG_DIR = "LOG_DIR"
+_EXAMPLES_SECTION = "Examples"
+_READ_CHUNK_BYTES = 64 * 1024
+# Pipe buffer per Codex process; a large limit keeps the transport from pausing
+# while the event loop is busy draining other targets.
+_PIPE_LIMIT_BYTES = 1 << 20
+_USAGE_LIMIT_MARKERS = (b"usage_limit_reached", b"Too Many Requests")
+# Start method for the report-parsing pool; forking a threaded process can
+# deadlock the child, so use a fork server where the platform has one.
+_POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+# Opt-in JSON sidecar for parsed configs (CODEXUP_YAML_CACHE=1).
+_YAML_CACHE_SUFFIX = ".cache.json"
 
 
 def _fail(msg: str) -> None:
@@ -27,20 +63,79 @@ def _fail(msg: str) -> None:
     sys.exit(1)
 
 
-def check_codex_prereqs() -> None:
-    """Ensure codex CLI and API key are available."""
-    if shutil.which("codex") is None:
+def check_codex_prereqs() -> str:
+    """Ensure codex CLI and API key are available; return the codex binary path."""
+    codex_bin = shutil.which("codex")
+    if codex_bin is None:
         _fail("codex CLI not found in PATH. Install it and try again.")
     if not os.getenv("OPENAI_API_KEY"):
         _fail("OPENAI_API_KEY is not set. Export it before running CodexUP.")
+    return codex_bin
+
+
+def _json_loads(data: bytes) -> Any:
+    """Decode JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is strict (no NaN/Infinity); let json decide what is valid.
+            pass
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """Encode an object as compact JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj)
+        except TypeError:
+            # e.g. non-str dict keys, which json coerces.
+            pass
+    return json.dumps(obj).encode("utf-8")
+
+
+def _read_yaml_cache(path: str) -> Optional[Any]:
+    """Return the cached parse of a YAML file if its JSON sidecar is current."""
+    cache_path = path + _YAML_CACHE_SUFFIX
+    try:
+        if os.stat(cache_path).st_mtime < os.stat(path).st_mtime:
+            return None
+        with open(cache_path, "rb") as f:
+            return _json_loads(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def _write_yaml_cache(path: str, data: Any) -> None:
+    """Store a parsed YAML document next to its source as JSON (best effort)."""
+    cache_path = path + _YAML_CACHE_SUFFIX
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        # Stdlib json rejects dates and other YAML-only types that orjson would stringify.
+        payload = json.dumps(data).encode("utf-8")
+        with open(tmp_path, "wb") as f:
+            f.write(payload)
+        os.replace(tmp_path, cache_path)
+    except (OSError, TypeError, ValueError):
+        # Read-only config dirs or non-JSON YAML values (dates, etc.) just skip caching.
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
 
 
 def load_config(path: str) -> Dict[str, Any]:
     """Load and validate the YAML config file."""
-    if yaml is None:
-        _fail("PyYAML is not installed. Please `pip install pyyaml`.")
-    with open(path, "r", encoding="utf-8") as f:
-        data = yaml.safe_load(f)
+    use_cache = os.getenv("CODEXUP_YAML_CACHE") == "1"
+    data = _read_yaml_cache(path) if use_cache else None
+    if data is None:
+        if yaml is None:
+            _fail("PyYAML is not installed. Please `pip install pyyaml`.")
+        with open(path, "rb") as f:
+            data = yaml.load(f, Loader=_YamlLoader)
+        if use_cache and isinstance(data, dict):
+            _write_yaml_cache(path, data)
     if not isinstance(data, dict):
         _fail("Config must be a YAML mapping.")
     return data
@@ -48,35 +143,110 @@ def load_config(path: str) -> Dict[str, Any]:
 
 def remove_section(text: str, header: str) -> str:
     """Remove a bracketed section by name, up to the next section header."""
-    pattern = re.compile(
-        rf"\[{re.escape(header)}\][\s\S]*?(\n\[[^\]]+\])",
-        re.MULTILINE,
-    )
-    match = pattern.search(text)
-    if not match:
-        # If this is the last section, drop to end of file.
-        tail_pattern = re.compile(
-            rf"\[{re.escape(header)}\][\s\S]*$",
-            re.MULTILINE,
-        )
-        tail_match = tail_pattern.search(text)
-        if not tail_match:
-            return text
-        return text[: tail_match.start()]
-    replaced = text[: match.start()] + match.group(1) + text[match.end():]
-    return replaced
+    marker = f"[{header}]"
+    start = text.find(marker)
+    if start == -1:
+        return text
+
+    # Next header is a "\n[...]" with a non-empty name; keep it in the output.
+    # Only the position of the last "]" matters, so look it up once rather than per candidate.
+    last_close = text.rfind("]")
+    pos = start + len(marker)
+    while True:
+        nxt = text.find("\n[", pos)
+        if nxt == -1 or nxt + 2 >= last_close:
+            # If this is the last section, drop to end of file.
+            return text[:start]
+        if text[nxt + 2] != "]":
+            return "".join((text[:start], text[nxt:]))
+        pos = nxt + 1
+
+
+def _parse_usage_limit_wait(data: bytes) -> Optional[int]:
+    """Return resets_in_seconds from the last usage-limit error line in `data`."""
+    wait = None
+    for line in data.splitlines():
+        if not any(m in line for m in _USAGE_LIMIT_MARKERS):
+            continue
+        # Try to parse resets_in_seconds from JSON in the line
+        try:
+            json_start = line.find(b"{")
+            if json_start != -1:
+                payload = _json_loads(line[json_start:])
+                resets = payload.get("error", {}).get("resets_in_seconds")
+                if isinstance(resets, int):
+                    wait = resets
+        except Exception:
+            continue
+    return wait
+
 
+# Leading name of a format field, before any ".attr" or "[index]".
+_FIELD_BASE_RE = re.compile(r"[^.\[]*")
 
-def render_prompt(template: str, ctx: Dict[str, str], use_examples: bool) -> str:
-    """Render the prompt template with placeholder substitutions."""
-    out = template
-    if not use_examples:
-        out = remove_section(out, "Examples")
 
-    return out.format_map(ctx)
+def _escape_braces(text: str) -> str:
+    return text.replace("{", "{{").replace("}", "}}")
 
 
-def run_codex(
+def prebake_template(template: str, ctx: Dict[str, str]) -> str:
+    """Substitute the bare `{KEY}` placeholders in `ctx` now, leaving the rest for format_map.
+
+    Fields with an index, attribute, conversion or format spec are kept as
+    written, so the renderer still needs `ctx` for them.
+    """
+    formatter = string.Formatter()
+    parts = []
+    for literal, field, spec, conversion in formatter.parse(template):
+        parts.append(_escape_braces(literal))
+        if field is None:
+            continue
+        if field in ctx and not spec and not conversion:
+            parts.append(_escape_braces(format(ctx[field], "")))
+            continue
+        conv = f"!{conversion}" if conversion else ""
+        fmt = f":{spec}" if spec else ""
+        parts.append(f"{{{field}{conv}{fmt}}}")
+    return "".join(parts)
+
+
+def compile_template(template: str) -> Callable[[Dict[str, str]], str]:
+    """Parse a format template once and return a renderer that only joins strings.
+
+    Fields with an index, attribute, conversion or spec are resolved per call
+    the way format_map does; templates with nested fields in a spec or
+    positional fields fall back to str.format_map.
+    """
+    formatter = string.Formatter()
+    pieces: list[str] = []
+    slots: list[Tuple[int, str]] = []
+    field_slots: list[Tuple[int, str, Optional[str], str]] = []
+    for literal, field, spec, conversion in formatter.parse(template):
+        if literal:
+            pieces.append(literal)
+        if field is None:
+            continue
+        if "{" in spec or not _FIELD_BASE_RE.match(field).group().isidentifier():
+            return template.format_map
+        if spec or conversion or not field.isidentifier():
+            field_slots.append((len(pieces), field, conversion, spec))
+        else:
+            slots.append((len(pieces), field))
+        pieces.append("")
+
+    def render(ctx: Dict[str, str]) -> str:
+        out = pieces.copy()
+        for i, name in slots:
+            out[i] = format(ctx[name], "")
+        for i, field, conversion, spec in field_slots:
+            value, _key = formatter.get_field(field, (), ctx)
+            out[i] = formatter.format_field(formatter.convert_field(value, conversion), spec)
+        return "".join(out)
+
+    return render
+
+
+async def run_codex(
     prompt: str,
     log_path: str,
     dry_run: bool,
@@ -85,7 +255,7 @@ def run_codex(
     extra_args: Optional[list[str]],
 ) -> tuple[int, float]:
     """Run codex with the rendered prompt and write stdout/stderr to a log file."""
-    cmd = ["codex", "exec", "--full-auto"]
+    cmd = [_CODEX_BIN, "exec", "--full-auto"]
     if model:
         cmd += ["--model", model]
     if extra_args:
@@ -98,8 +268,6 @@ def run_codex(
         print(f"[codexup] cwd: {cwd}")
         return 0, 0.0
 
-    os.makedirs(os.path.dirname(log_path), exist_ok=True)
-
     attempt = 0
     while True:
         attempt += 1
@@ -108,33 +276,42 @@ def run_codex(
             f"{log_path_obj.stem}_attempt{attempt}{log_path_obj.suffix}"
         )
         attempt_start = time.time()
-        with open(attempt_log_path, "w", encoding="utf-8") as log_file:
-            process = subprocess.Popen(
-                cmd,
+        with open(attempt_log_path, "wb") as log_file:
+            process = await asyncio.create_subprocess_exec(
+                *cmd,
                 cwd=cwd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.STDOUT,
+                limit=_PIPE_LIMIT_BYTES,
             )
             assert process.stdout is not None
 
+            sys.stdout.flush()
+            out = getattr(sys.stdout, "buffer", None)
             usage_limit_wait = None
-            for line in process.stdout:
-                print(line, end="")
-                log_file.write(line)
-                if "usage_limit_reached" in line or "Too Many Requests" in line:
-                    # Try to parse resets_in_seconds from JSON in the line
-                    try:
-                        json_start = line.find("{")
-                        if json_start != -1:
-                            payload = json.loads(line[json_start:])
-                            resets = payload.get("error", {}).get("resets_in_seconds")
-                            if isinstance(resets, int):
-                                usage_limit_wait = resets
-                    except Exception:
-                        usage_limit_wait = usage_limit_wait
-
-            exit_code = process.wait()
+            pending = b""
+            while True:
+                chunk = await process.stdout.read(_READ_CHUNK_BYTES)
+                if chunk:
+                    # Only pass on complete lines so parallel targets don't interleave mid-line.
+                    data = pending + chunk
+                    cut = data.rfind(b"\n") + 1
+                    pending, data = data[cut:], data[:cut]
+                else:
+                    data, pending = pending, b""
+                if data:
+                    if out is not None:
+                        out.write(data)
+                        out.flush()
+                    log_file.write(data)
+                    if any(m in data for m in _USAGE_LIMIT_MARKERS):
+                        resets = _parse_usage_limit_wait(data)
+                        if resets is not None:
+                            usage_limit_wait = resets
+                if not chunk:
+                    break
+
+            exit_code = await process.wait()
 
         attempt_duration = time.time() - attempt_start
 
@@ -145,10 +322,20 @@ def run_codex(
 
         # Usage limit hit: sleep and retry
         sleep_for = usage_limit_wait + 5
-        time.sleep(sleep_for)
+        await asyncio.sleep(sleep_for)
 
-_metrics_lock = threading.Lock()
 _RUN_MARKER_PREFIX = "[Run-ID] CODEXUP_RUN_ID="
+# Allowance for clock/mtime granularity when filtering sessions by start time.
+_SESSION_MTIME_SLACK_SEC = 5.0
+_RUN_ID_PAT = re.compile(rb"CODEXUP_RUN_ID=([0-9a-f]{32})")
+# run_id -> session file, plus the (mtime, size) each file had when last indexed.
+_session_index: Dict[str, Path] = {}
+_session_stamps: Dict[Path, Tuple[float, int]] = {}
+_session_index_lock = threading.Lock()
+_SESSION_SCAN_WORKERS = 8
+# How long one walk of the sessions tree is shared between lookups.
+_SESSION_LIST_TTL_SEC = 5.0
+_HIT_STATUSES = frozenset({"hit", "covered", "both", "1", "true"})
 
 
 def inject_run_marker(prompt: str, run_id: str) -> str:
@@ -162,25 +349,133 @@ def _get_codex_sessions_root() -> Path:
     return Path(codex_home) / "sessions"
 
 
-def find_session_file_by_marker(run_id: str) -> Optional[Path]:
-    """Find a Codex session JSONL file containing the run marker."""
+def find_session_file_by_marker(run_id: str, since: Optional[float] = None) -> Optional[Path]:
+    """Find a Codex session JSONL file containing the run marker.
+
+    If `since` is given, only sessions modified after that time are scanned.
+    Every run marker seen during a scan is indexed, so parallel targets
+    usually find their session without reading the files again.
+    """
+    with _session_index_lock:
+        cached = _session_index.get(run_id)
+    if cached is not None:
+        return cached
+
     sessions_root = _get_codex_sessions_root()
     if not sessions_root.exists():
         return None
 
-    marker = f"{_RUN_MARKER_PREFIX}{run_id}"
-    candidates = sessions_root.glob("**/rollout-*.jsonl")
-    for path in candidates:
+    cutoff = since - _SESSION_MTIME_SLACK_SEC if since is not None else None
+    lookup_start = time.time()
+    listed_at, paths = _list_rollout_files(sessions_root, int(lookup_start // _SESSION_LIST_TTL_SEC))
+    found = _index_rollouts(paths, cutoff, run_id)
+    # A miss only warrants another walk if the shared listing may predate this
+    # run's session file, i.e. it was taken before (or right as) Codex started.
+    # Without `since` any listing older than this lookup is suspect.
+    fresh_after = since + _SESSION_MTIME_SLACK_SEC if since is not None else lookup_start
+    if found is None and listed_at < fresh_after:
+        _list_rollout_files.cache_clear()
+        _listed_at, paths = _list_rollout_files(sessions_root, int(time.time() // _SESSION_LIST_TTL_SEC))
+        found = _index_rollouts(paths, cutoff, run_id)
+    return found
+
+
+@functools.lru_cache(maxsize=1)
+def _list_rollout_files(sessions_root: Path, generation: int) -> Tuple[float, Tuple[Path, ...]]:
+    """Walk the sessions tree; shared by all workers until `generation` changes."""
+    return time.time(), tuple(sessions_root.glob("**/rollout-*.jsonl"))
+
+
+def _index_rollouts(paths: Iterable[Path], cutoff: Optional[float], run_id: str) -> Optional[Path]:
+    """Index markers in recently modified rollouts and look up `run_id`."""
+    candidates = []
+    for path in paths:
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        if st.st_size < len(_RUN_MARKER_PREFIX):
+            continue
+        if cutoff is not None and st.st_mtime < cutoff:
+            continue
+        candidates.append((st.st_mtime, st.st_size, path))
+    # Recent sessions are the likely hits, so index them first.
+    candidates.sort(key=lambda item: item[0], reverse=True)
+
+    with _session_index_lock:
+        stale = [
+            (path, (mtime, size))
+            for mtime, size, path in candidates
+            if _session_stamps.get(path) != (mtime, size)
+        ]
+    _index_session_markers(stale)
+
+    with _session_index_lock:
+        return _session_index.get(run_id)
+
+
+def _scan_run_ids(path: Path) -> list[str]:
+    """Return every run id marker found in one session file."""
+    try:
+        with path.open("rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return [m.decode("ascii") for m in _RUN_ID_PAT.findall(mm)]
+    except Exception:
+        return []
+
+
+def _index_session_markers(entries: list[Tuple[Path, Tuple[float, int]]]) -> None:
+    """Scan session files once each and record which run ids they contain."""
+    if not entries:
+        return
+    paths = [path for path, _stamp in entries]
+    if len(paths) <= _SESSION_SCAN_WORKERS:
+        found = [_scan_run_ids(p) for p in paths]
+    else:
+        with ThreadPoolExecutor(max_workers=_SESSION_SCAN_WORKERS) as pool:
+            found = list(pool.map(_scan_run_ids, paths))
+    with _session_index_lock:
+        for (path, stamp), run_ids in zip(entries, found):
+            _session_stamps[path] = stamp
+            for rid in run_ids:
+                # Entries are newest first; keep the most recent session per run id.
+                _session_index.setdefault(rid, path)
+
+
+def _last_token_total(lines: Iterable[bytes]) -> Optional[Dict[str, Any]]:
+    """Return total_token_usage from the first token_count event in `lines`."""
+    for line in lines:
+        if b"token_count" not in line:
+            continue
         try:
-            with path.open("r", encoding="utf-8") as f:
-                for line in f:
-                    if marker in line:
-                        return path
+            obj = _json_loads(line)
         except Exception:
             continue
+        if not isinstance(obj, dict) or obj.get("type") != "event_msg":
+            continue
+        payload = obj.get("payload") or {}
+        if payload.get("type") != "token_count":
+            continue
+        info = payload.get("info") or {}
+        total = info.get("total_token_usage")
+        if isinstance(total, dict):
+            return total
     return None
 
 
+def _token_count_lines_reversed(mm: mmap.mmap) -> Iterable[bytes]:
+    """Yield lines mentioning token_count, last one first, without splitting the file."""
+    end = len(mm)
+    while True:
+        hit = mm.rfind(b"token_count", 0, end)
+        if hit == -1:
+            return
+        start = mm.rfind(b"\n", 0, hit) + 1
+        stop = mm.find(b"\n", hit)
+        yield mm[start:stop if stop != -1 else len(mm)]
+        end = start
+
+
 def parse_token_usage_from_session(session_path: Path) -> Dict[str, Optional[int]]:
     """Parse token usage from a Codex session JSONL file."""
     if not session_path or not session_path.exists():
@@ -194,21 +489,9 @@ def parse_token_usage_from_session(session_path: Path) -> Dict[str, Optional[int
 
     last_total = None
     try:
-        with session_path.open("r", encoding="utf-8") as f:
-            for line in f:
-                try:
-                    obj = json.loads(line)
-                except Exception:
-                    continue
-                if obj.get("type") != "event_msg":
-                    continue
-                payload = obj.get("payload") or {}
-                if payload.get("type") != "token_count":
-                    continue
-                info = payload.get("info") or {}
-                total = info.get("total_token_usage")
-                if isinstance(total, dict):
-                    last_total = total
+        with session_path.open("rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                last_total = _last_token_total(_token_count_lines_reversed(mm))
     except Exception:
         last_total = None
 
@@ -244,47 +527,66 @@ def parse_token_usage_from_session(session_path: Path) -> Dict[str, Optional[int
     }
 
 
-def read_coverage_metrics(proof_dir: str) -> Dict[str, Any]:
-    coverage_path = os.path.join(proof_dir, "build", "report", "json", "viewer-coverage.json")
-    if not os.path.exists(coverage_path):
-        return {"coverage_path": coverage_path, "overall": None, "non_harness": None}
+def _count_hits(statuses: list[Any]) -> int:
+    """Count covered lines; same result as `str(status).lower() in _HIT_STATUSES`."""
+    hits = 0
+    # Reports use a handful of distinct status strings; classify each one once.
+    seen: Dict[str, bool] = {}
+    for status in statuses:
+        kind = type(status)
+        if kind is str:
+            is_hit = seen.get(status)
+            if is_hit is None:
+                is_hit = seen[status] = status.lower() in _HIT_STATUSES
+            if is_hit:
+                hits += 1
+        elif status is True or (kind is int and status == 1):
+            hits += 1
+    return hits
+
+
+def _report_path(proof_dir: str, name: str) -> str:
+    return os.path.join(proof_dir, "build", "report", "json", name)
+
 
+def _load_coverage_metrics(coverage_path: str) -> Tuple[Dict[str, Any], bool]:
+    """Read coverage metrics and report whether the coverage file exists."""
     try:
-        with open(coverage_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with open(coverage_path, "rb") as f:
+            data = _json_loads(f.read())
+    except FileNotFoundError:
+        return {"coverage_path": coverage_path, "overall": None, "non_harness": None}, False
     except Exception:
-        return {"coverage_path": coverage_path, "overall": None, "non_harness": None}
+        return {"coverage_path": coverage_path, "overall": None, "non_harness": None}, True
 
     viewer = data.get("viewer-coverage", {})
     overall = viewer.get("overall_coverage", {})
 
     coverage = viewer.get("coverage", {})
-    non_harness_hit = 0
-    non_harness_total = 0
-    harness_hit = 0
-    harness_total = 0
+    harness_statuses: list[Any] = []
+    non_harness_statuses: list[Any] = []
     if isinstance(coverage, dict):
         for file_path, funcs in coverage.items():
-            is_harness = str(file_path).endswith("_harness.c")
             if not isinstance(funcs, dict):
                 continue
-            for _func, lines in funcs.items():
-                if not isinstance(lines, dict):
-                    continue
-                for _line, status in lines.items():
-                    if is_harness:
-                        harness_total += 1
-                        if str(status).lower() in {"hit", "covered", "both", "1", "true"}:
-                            harness_hit += 1
-                    else:
-                        non_harness_total += 1
-                        if str(status).lower() in {"hit", "covered", "both", "1", "true"}:
-                            non_harness_hit += 1
+            # JSON object keys are always str, so no str() coercion is needed.
+            bucket = harness_statuses if file_path.endswith("_harness.c") else non_harness_statuses
+            bucket.extend(
+                status
+                for lines in funcs.values()
+                if isinstance(lines, dict)
+                for status in lines.values()
+            )
+
+    harness_total = len(harness_statuses)
+    harness_hit = _count_hits(harness_statuses)
+    non_harness_total = len(non_harness_statuses)
+    non_harness_hit = _count_hits(non_harness_statuses)
 
     non_harness_pct = (non_harness_hit / non_harness_total) if non_harness_total else None
     harness_pct = (harness_hit / harness_total) if harness_total else None
 
-    return {
+    metrics = {
         "coverage_path": coverage_path,
         "overall": {
             "hit": overall.get("hit"),
@@ -302,15 +604,21 @@ def read_coverage_metrics(proof_dir: str) -> Dict[str, Any]:
             "percentage": non_harness_pct,
         },
     }
+    return metrics, True
+
+
+def read_coverage_metrics(proof_dir: str) -> Dict[str, Any]:
+    return _load_coverage_metrics(_report_path(proof_dir, "viewer-coverage.json"))[0]
 
 
 def read_verification_results(proof_dir: str) -> Dict[str, Any]:
-    result_path = os.path.join(proof_dir, "build", "report", "json", "viewer-result.json")
-    if not os.path.exists(result_path):
-        return {"result_path": result_path, "error_count": None}
+    return _load_verification_results(_report_path(proof_dir, "viewer-result.json"))
+
+
+def _load_verification_results(result_path: str) -> Dict[str, Any]:
     try:
-        with open(result_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        with open(result_path, "rb") as f:
+            data = _json_loads(f.read())
     except Exception:
         return {"result_path": result_path, "error_count": None}
     results = data.get("viewer-result", {}).get("results", {})
@@ -359,39 +667,117 @@ def estimate_cost(tokens: Dict[str, Optional[int]], pricing: Optional[Dict[str,
     }
 
 
-def write_metrics(metrics_path: str, data: Dict[str, Any]) -> None:
-    os.makedirs(os.path.dirname(metrics_path), exist_ok=True)
-    with _metrics_lock:
-        with open(metrics_path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(data) + "\n")
+# Metrics records for the writer thread; None tells it to stop.
+_MetricsQueue = queue.Queue[Optional[Dict[str, Any]]]
+
+
+def write_metrics(metrics_queue: _MetricsQueue, data: Dict[str, Any]) -> None:
+    """Hand a metrics record to the writer thread."""
+    metrics_queue.put(data)
 
 
+def _metrics_writer(metrics_fd: int, metrics_queue: _MetricsQueue, errors: list[str]) -> None:
+    """Append queued metrics records in batches until a None sentinel arrives.
+
+    A record that cannot be written is reported and added to `errors`; the
+    writer keeps draining so main() can fail the run after join().
+    """
+    done = False
+    while not done:
+        batch = [metrics_queue.get()]
+        while True:
+            try:
+                batch.append(metrics_queue.get_nowait())
+            except queue.Empty:
+                break
+        lines = []
+        for data in batch:
+            if data is None:
+                done = True
+                continue
+            try:
+                lines.append(_json_dumps(data) + b"\n")
+            except Exception as exc:
+                msg = f"could not encode metrics for {data.get('function', '<unknown>')}: {exc}"
+                print(f"[codexup] {msg}", file=sys.stderr)
+                errors.append(msg)
+        # Unbuffered O_APPEND writes: each batch lands at the end of the file as
+        # soon as it is written, so finished targets survive an interrupted run.
+        payload = memoryview(b"".join(lines))
+        try:
+            while payload:
+                payload = payload[os.write(metrics_fd, payload):]
+        except OSError as exc:
+            msg = f"could not append {len(lines)} metrics record(s): {exc}"
+            print(f"[codexup] {msg}", file=sys.stderr)
+            errors.extend([msg] * len(lines))
+
+
+@dataclass(frozen=True, slots=True)
+class TargetPaths:
+    """Filesystem locations for one target, computed once."""
+
+    target_file: str
+    proof_dir: str
+    log_path: str
+    coverage_path: str
+    result_path: str
+
+    @classmethod
+    def build(cls, project_root: str, proof_root: str, log_dir: str, function: str, file_path: str) -> "TargetPaths":
+        proof_dir = os.path.join(project_root, proof_root, function)
+        return cls(
+            target_file=os.path.join(project_root, file_path),
+            proof_dir=proof_dir,
+            log_path=os.path.join(log_dir, f"codex_{function}.log"),
+            coverage_path=_report_path(proof_dir, "viewer-coverage.json"),
+            result_path=_report_path(proof_dir, "viewer-result.json"),
+        )
+
+
+def _parse_run_reports(
+    session_path: Optional[Path],
+    paths: TargetPaths,
+) -> Tuple[Dict[str, Optional[int]], Dict[str, Any], bool, Dict[str, Any]]:
+    """Parse session tokens and proof reports after a Codex run.
+
+    Pure parsing with picklable inputs and outputs, so it can run in a process pool.
+    """
+    tokens = parse_token_usage_from_session(session_path) if session_path else {
+        "input_tokens": None,
+        "cached_tokens": None,
+        "output_tokens": None,
+        "reasoning_tokens": None,
+        "total_tokens": None,
+    }
+    coverage, compile_success = _load_coverage_metrics(paths.coverage_path)
+    verification = _load_verification_results(paths.result_path)
+    return tokens, coverage, compile_success, verification
 
 
-def _run_target(
-    template: str,
+async def _run_target(
+    render_prompt: Callable[[Dict[str, str]], str],
     target: Dict[str, Any],
     project_root: str,
     proof_root: str,
-    makefile_include_dir: str,
-    examples_dir: str,
-    use_examples: bool,
+    log_dir: str,
     dry_run: bool,
-    metrics_path: str,
+    metrics_queue: _MetricsQueue,
     pricing: Optional[Dict[str, float]],
     model: Optional[str],
     extra_args: Optional[list[str]],
+    parse_pool: Optional[Executor] = None,
 ) -> Dict[str, Any]:
     """Run Codex for a single target definition."""
+    loop = asyncio.get_running_loop()
     function = target.get("function")
     file_path = target.get("file_path")
     if not function or not file_path:
         _fail("Each target must include function and file_path.")
 
-    target_file = os.path.join(project_root, file_path)
-    proof_dir = os.path.join(project_root, proof_root, function)
-    makefile_include = os.path.join(makefile_include_dir, "Makefile.include")
-    log_dir = os.path.join(project_root, proof_root, "logs")
+    paths = TargetPaths.build(project_root, proof_root, log_dir, function, file_path)
+    target_file = paths.target_file
+    proof_dir = paths.proof_dir
     os.makedirs(proof_dir, exist_ok=True)
 
     # Checks if target file exists.
@@ -428,29 +814,27 @@ def _run_target(
                 "reasoning_tokens": None,
                 "total_tokens": None,
             }, pricing),
-            "coverage": read_coverage_metrics(proof_dir),
-            "verification": read_verification_results(proof_dir),
+            "coverage": (await loop.run_in_executor(None, _load_coverage_metrics, paths.coverage_path))[0],
+            "verification": await loop.run_in_executor(None, _load_verification_results, paths.result_path),
             "preflight_error": preflight_error,
         }
-        write_metrics(metrics_path, metrics)
+        write_metrics(metrics_queue, metrics)
         return metrics
 
     ctx = {
-        "FUNCTION_NAME": function,
-        "TARGET_FILE": target_file,
-        "PROOF_DIR": proof_dir,
-        "MAKEFILE_INCLUDE": makefile_include,
-        "EXAMPLES_DIR": examples_dir,
-        "LOG_DIR": log_dir,
+        _K_FUNCTION_NAME: function,
+        _K_TARGET_FILE: target_file,
+        _K_PROOF_DIR: proof_dir,
     }
 
-    prompt = render_prompt(template, ctx, use_examples)
+    prompt = render_prompt(ctx)
     run_id = uuid.uuid4().hex
     prompt = inject_run_marker(prompt, run_id)
 
-    log_path = os.path.join(log_dir, f"codex_{function}.log")
+    log_path = paths.log_path
 
-    exit_code, duration_sec = run_codex(
+    codex_start = time.time()
+    exit_code, duration_sec = await run_codex(
         prompt,
         log_path,
         dry_run,
@@ -459,21 +843,16 @@ def _run_target(
         extra_args=extra_args,
     )
 
-    session_path = find_session_file_by_marker(run_id)
-    tokens = parse_token_usage_from_session(session_path) if session_path else {
-        "input_tokens": None,
-        "cached_tokens": None,
-        "output_tokens": None,
-        "reasoning_tokens": None,
-        "total_tokens": None,
-    }
+    # Session lookup blocks on disk and shares the in-process marker index, so it
+    # stays on a thread; the JSON parsing is CPU-bound and goes to parse_pool.
+    session_path = await loop.run_in_executor(
+        None, functools.partial(find_session_file_by_marker, run_id, since=codex_start)
+    )
+    tokens, coverage, compile_success, verification = await loop.run_in_executor(
+        parse_pool, _parse_run_reports, session_path, paths
+    )
     costs = estimate_cost(tokens, pricing)
 
-    coverage = read_coverage_metrics(proof_dir)
-    verification = read_verification_results(proof_dir)
-
-    compile_success = os.path.exists(coverage.get("coverage_path", ""))
-
     metrics = {
         "function": function,
         "proof_dir": proof_dir,
@@ -489,7 +868,7 @@ def _run_target(
         "coverage": coverage,
         "verification": verification,
     }
-    write_metrics(metrics_path, metrics)
+    write_metrics(metrics_queue, metrics)
     return metrics
 
 
@@ -505,10 +884,17 @@ def main() -> None:
     parser.add_argument("--jobs", type=int, default=1, help="Number of parallel targets to run (default: 1).")
     args = parser.parse_args()
 
-    check_codex_prereqs()
+    global _CODEX_BIN
+    _CODEX_BIN = check_codex_prereqs()
 
-    proof_config = load_config(args.proof_config)
-    codex_config = load_config(args.codex_config)
+    # The two configs and the prompt are independent reads; overlap them.
+    with ThreadPoolExecutor(max_workers=3) as executor:
+        proof_future = executor.submit(load_config, args.proof_config)
+        codex_future = executor.submit(load_config, args.codex_config)
+        prompt_future = executor.submit(Path(args.prompt).read_text, encoding="utf-8")
+        proof_config = proof_future.result()
+        codex_config = codex_future.result()
+        template = prompt_future.result()
 
     project_root = proof_config.get("project_root")
     proof_root = proof_config.get("proof_root")
@@ -525,9 +911,6 @@ def main() -> None:
     if not targets:
         _fail("No targets found in config.")
 
-    with open(args.prompt, "r", encoding="utf-8") as f:
-        template = f.read()
-
     proof_root_dir = os.path.join(project_root, proof_root)
     os.makedirs(proof_root_dir, exist_ok=True)
     prompt_path = os.path.join(proof_root_dir, "prompt.txt")
@@ -537,51 +920,116 @@ def main() -> None:
 
     selected_targets = targets[: args.limit] if args.limit else targets
 
-    metrics_path = os.path.join(project_root, proof_root, "logs", "codex_metrics.jsonl")
-    summary_path = os.path.join(project_root, proof_root, "logs", "codex_summary.json")
+    # Target-independent paths; the log dir is created once for all workers.
+    makefile_include = os.path.join(makefile_include_dir, "Makefile.include")
+    log_dir = os.path.join(proof_root_dir, "logs")
+    os.makedirs(log_dir, exist_ok=True)
+    metrics_path = os.path.join(log_dir, "codex_metrics.jsonl")
+    summary_path = os.path.join(log_dir, "codex_summary.json")
+
+    # Section stripping and run-wide placeholders are target-independent, so do
+    # them once per run; workers only fill in the per-target fields.
+    base_template = template if args.use_examples else remove_section(template, _EXAMPLES_SECTION)
+    run_ctx = {
+        _K_MAKEFILE_INCLUDE: makefile_include,
+        _K_EXAMPLES_DIR: examples_dir,
+        _K_LOG_DIR: log_dir,
+    }
+    render_template = compile_template(prebake_template(base_template, run_ctx))
+
+    def render_prompt(ctx: Dict[str, str]) -> str:
+        # Placeholders prebaking kept (e.g. {LOG_DIR[0]}) still need the run-wide values.
+        return render_template({**run_ctx, **ctx})
 
-    metrics_list: list[Dict[str, Any]] = []
+    # Fold each finished target into the run summary as it completes.
+    summary_acc = MetricsAccumulator()
     failures = 0
-    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as executor:
-        futures = {
-            executor.submit(
-                _run_target,
-                template,
-                target,
-                project_root,
-                proof_root,
-                makefile_include_dir,
-                examples_dir,
-                args.use_examples,
-                args.dry_run,
-                metrics_path,
-                pricing,
-                model,
-                extra_args,
-            ): target
-            for target in selected_targets
-        }
+    # Targets mostly wait on Codex; more slots than targets buys nothing.
+    num_workers = max(1, min(args.jobs, len(selected_targets)))
+
+    async def _run_all(metrics_queue: _MetricsQueue) -> None:
+        nonlocal failures
+        semaphore = asyncio.Semaphore(num_workers)
 
-        for future in as_completed(futures):
-            target = futures[future]
+        async def _guarded(
+            target: Dict[str, Any],
+        ) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]], Optional[BaseException]]:
+            async with semaphore:
+                try:
+                    metrics = await _run_target(
+                        render_prompt,
+                        target,
+                        project_root,
+                        proof_root,
+                        log_dir,
+                        args.dry_run,
+                        metrics_queue,
+                        pricing,
+                        model,
+                        extra_args,
+                        parse_pool,
+                    )
+                except (Exception, SystemExit) as exc:
+                    return target, None, exc
+                return target, metrics, None
+
+        # A SystemExit from one target (a bad target definition) is raised only
+        # after the rest finish, so no Codex child is left running unattended.
+        exit_exc: Optional[SystemExit] = None
+        for next_done in asyncio.as_completed([_guarded(t) for t in selected_targets]):
+            target, metrics, exc = await next_done
             function = target.get("function", "<unknown>")
-            try:
-                metrics = future.result()
-                metrics_list.append(metrics)
-            except Exception as exc:
+            if isinstance(exc, SystemExit):
+                exit_exc = exit_exc or exc
+                continue
+            if exc is not None:
                 print(f"[codexup] {function} failed with exception: {exc}", file=sys.stderr)
                 failures += 1
                 continue
+            summary_acc.add(metrics)
             if metrics.get("exit_code", 0) != 0:
                 print(f"[codexup] {function} failed (exit {metrics.get('exit_code')}).", file=sys.stderr)
                 failures += 1
-
-    summary = summarize_metrics(metrics_list)
+        if exit_exc is not None:
+            raise exit_exc
+
+    # With several targets in flight, parse their reports in separate processes
+    # so large coverage JSON doesn't serialize on the GIL.
+    parse_workers = min(num_workers, os.cpu_count() or 1)
+    # The pool starts its workers lazily, after the writer thread and the event
+    # loop's executor threads exist, so they must not be plain fork()s.
+    parse_pool = (
+        ProcessPoolExecutor(max_workers=parse_workers, mp_context=multiprocessing.get_context(_POOL_START_METHOD))
+        if parse_workers > 1
+        else None
+    )
+    write_errors: list[str] = []
+    try:
+        metrics_fd = os.open(metrics_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            metrics_queue: _MetricsQueue = queue.Queue()
+            writer = threading.Thread(
+                target=_metrics_writer, args=(metrics_fd, metrics_queue, write_errors), daemon=True
+            )
+            writer.start()
+            try:
+                asyncio.run(_run_all(metrics_queue))
+            finally:
+                metrics_queue.put(None)
+                writer.join()
+        finally:
+            os.close(metrics_fd)
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown()
+
+    summary = summary_acc.summary()
     if summary:
-        os.makedirs(os.path.dirname(summary_path), exist_ok=True)
         with open(summary_path, "w", encoding="utf-8") as f:
             json.dump(summary, f, indent=2)
 
+    if write_errors:
+        _fail(f"{len(write_errors)} metrics record(s) were not written to {metrics_path}.")
     if failures:
         _fail(f"{failures} target(s) failed.")
 
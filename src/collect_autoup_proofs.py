@@ -2,18 +2,40 @@
 import argparse
 import os
 import shutil
+import subprocess
+import sys
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import yaml  # type: ignore
+except Exception:
+    yaml = None
+
+# Prefer the LibYAML-backed loader when PyYAML was built with it.
+_YamlLoader = getattr(yaml, "CSafeLoader", None) or getattr(yaml, "SafeLoader", None)
 
 
 def _parse_targets_from_yaml(path: Path) -> List[str]:
     functions: List[str] = []
     try:
-        lines = path.read_text(encoding="utf-8", errors="ignore").splitlines()
+        raw = path.read_bytes()
     except Exception:
         return functions
 
-    for line in lines:
+    if yaml is not None:
+        try:
+            data = yaml.load(raw, Loader=_YamlLoader)
+        except Exception:
+            data = None
+        if isinstance(data, dict):
+            for target in data.get("targets") or []:
+                if isinstance(target, dict) and target.get("function"):
+                    functions.append(str(target["function"]))
+            return functions
+
+    # Without PyYAML (or for unparsable files) fall back to scanning lines.
+    for line in raw.decode("utf-8", errors="ignore").splitlines():
         line = line.strip()
         if not line or line.startswith("#"):
             continue
@@ -26,42 +48,106 @@ def _parse_targets_from_yaml(path: Path) -> List[str]:
 
 
 def _is_valid_proof_dir(path: Path) -> bool:
-    if not (path / "Makefile").is_file():
-        return False
-    if not list(path.glob("*_harness.c")):
-        return False
-    if not (path / "build").is_dir():
+    # One scandir pass instead of separate is_file/glob/is_dir probes.
+    has_makefile = has_harness = has_build = False
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                name = entry.name
+                try:
+                    if name == "Makefile":
+                        has_makefile = entry.is_file()
+                    elif name == "build":
+                        has_build = entry.is_dir()
+                    elif name.endswith("_harness.c"):
+                        has_harness = True
+                except OSError:
+                    continue
+    except OSError:
         return False
-    return True
+    return has_makefile and has_harness and has_build
+
+
+def _iter_subdirs(root: str) -> Iterator[os.DirEntry[str]]:
+    """Yield DirEntry objects for all directories under root, in os.walk order."""
+    try:
+        with os.scandir(root) as it:
+            subdirs = []
+            for entry in it:
+                try:
+                    if entry.is_dir():
+                        subdirs.append(entry)
+                except OSError:
+                    continue
+    except OSError:
+        return
+    yield from subdirs
+    for entry in subdirs:
+        # Like os.walk, list symlinked dirs but don't descend into them.
+        if not entry.is_symlink():
+            yield from _iter_subdirs(entry.path)
 
 
 def _find_latest_proof_dirs(root: Path, functions: List[str]) -> Dict[str, Path]:
     wanted = set(functions)
     latest: Dict[str, Tuple[float, Path]] = {}
 
-    for dirpath, dirnames, _filenames in os.walk(root):
-        for d in list(dirnames):
-            if d not in wanted:
-                continue
-            p = Path(dirpath) / d
-            if not _is_valid_proof_dir(p):
-                continue
-            try:
-                mtime = p.stat().st_mtime
-            except Exception:
-                continue
-            current = latest.get(d)
-            if current is None or mtime > current[0]:
-                latest[d] = (mtime, p)
+    for entry in _iter_subdirs(str(root)):
+        d = entry.name
+        if d not in wanted:
+            continue
+        p = Path(entry.path)
+        if not _is_valid_proof_dir(p):
+            continue
+        try:
+            mtime = entry.stat().st_mtime
+        except Exception:
+            continue
+        current = latest.get(d)
+        if current is None or mtime > current[0]:
+            latest[d] = (mtime, p)
 
     return {k: v[1] for k, v in latest.items()}
 
 
+def _reflink_copy_cmd(src: Path, dest: Path) -> Optional[List[str]]:
+    # Copy-on-write clones where the filesystem supports them (Btrfs/XFS, APFS).
+    # -L matches copytree's default of copying symlink targets.
+    if sys.platform.startswith("linux"):
+        return ["cp", "-R", "-L", "-p", "--reflink=auto", str(src), str(dest)]
+    if sys.platform == "darwin":
+        return ["cp", "-c", "-R", "-L", "-p", str(src), str(dest)]
+    return None
+
+
+def _remove_cache_dirs(root: Path) -> None:
+    for dirpath, dirnames, filenames in os.walk(root):
+        if ".cache" in dirnames:
+            dirnames.remove(".cache")
+            shutil.rmtree(os.path.join(dirpath, ".cache"), ignore_errors=True)
+        if ".cache" in filenames:
+            os.remove(os.path.join(dirpath, ".cache"))
+
+
 def _copy_dir(src: Path, dest: Path, overwrite: bool) -> None:
     if dest.exists():
         if not overwrite:
             return
         shutil.rmtree(dest)
+
+    cmd = _reflink_copy_cmd(src, dest)
+    if cmd is not None:
+        try:
+            result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        except OSError:
+            result = None
+        if result is not None and result.returncode == 0:
+            _remove_cache_dirs(dest)
+            return
+        # cp fails on unreadable files; fall back to copytree, which skips them.
+        if dest.exists():
+            shutil.rmtree(dest)
+
     def _ignore(dirpath: str, names: List[str]) -> set:
         ignored = set()
         for name in names:
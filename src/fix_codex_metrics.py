@@ -1,58 +1,137 @@
 #!/usr/bin/env python3
 import argparse
+import functools
 import json
+import os
 import sys
 import tempfile
+from concurrent.futures import Future, ProcessPoolExecutor
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, List, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
 
 SCRIPT_DIR = Path(__file__).resolve().parent
-sys.path.insert(0, str(SCRIPT_DIR))
+
+# codexup (and its YAML/asyncio imports) is only needed by the coverage fixer;
+# it is imported on first use so --revert and paths-only runs skip it.
+_read_coverage_metrics: Optional[Callable[[str], Dict[str, Any]]] = None
 
 try:
-    from codexup import read_coverage_metrics
-except Exception as exc:  # pragma: no cover - import guard for CLI use
-    raise SystemExit(f"Failed to import codexup.py: {exc}")
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
 
+_POSIX_PATHS = os.sep == "/"
+# Records are small; large buffers turn one write per line into a few big syscalls.
+_IO_BUFFER_BYTES = 1 << 20
+# Unchanged runs at least this long are copied kernel-side instead of rewritten.
+_COPY_RANGE_MIN_BYTES = 64 * 1024
+# In-place rewrites go to an unnamed O_TMPFILE on Linux; cleared if the filesystem
+# or /proc setup can't support it.
+_USE_O_TMPFILE = hasattr(os, "O_TMPFILE")
 
 Record = Dict[str, Any]
 Fixer = Callable[[Record, Dict[str, Any]], bool]
 
 
-def _flatten_coverage(coverage: Dict[str, Any]) -> Dict[str, Any]:
+def _json_loads(data: bytes) -> Any:
+    """Decode one JSONL record, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is strict (no NaN/Infinity); let json decide what is valid.
+            pass
+    return json.loads(data)
+
+
+def _json_dumps_line(record: Record) -> bytes:
+    """Encode one JSONL record plus newline, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass
+    return (json.dumps(record, ensure_ascii=True) + "\n").encode("utf-8")
+
+
+# Flattened coverage columns a record may carry alongside (or instead of) "coverage".
+_COV_KEYS = (
+    "coverage.coverage_path",
+    "coverage.overall.hit",
+    "coverage.overall.total",
+    "coverage.overall.percentage",
+    "coverage.non_harness.hit",
+    "coverage.non_harness.total",
+    "coverage.non_harness.percentage",
+    "coverage.harness.hit",
+    "coverage.harness.total",
+    "coverage.harness.percentage",
+)
+_FLAT_COV_KEYS = frozenset(_COV_KEYS)
+
+
+def _flat_coverage_values(coverage: Dict[str, Any]) -> Tuple[Any, ...]:
+    """Values for _COV_KEYS, in the same order."""
     overall = coverage.get("overall") or {}
     non_harness = coverage.get("non_harness") or {}
     harness = coverage.get("harness") or {}
-    return {
-        "coverage.coverage_path": coverage.get("coverage_path"),
-        "coverage.overall.hit": overall.get("hit"),
-        "coverage.overall.total": overall.get("total"),
-        "coverage.overall.percentage": overall.get("percentage"),
-        "coverage.non_harness.hit": non_harness.get("hit"),
-        "coverage.non_harness.total": non_harness.get("total"),
-        "coverage.non_harness.percentage": non_harness.get("percentage"),
-        "coverage.harness.hit": harness.get("hit"),
-        "coverage.harness.total": harness.get("total"),
-        "coverage.harness.percentage": harness.get("percentage"),
-    }
+    return (
+        coverage.get("coverage_path"),
+        overall.get("hit"),
+        overall.get("total"),
+        overall.get("percentage"),
+        non_harness.get("hit"),
+        non_harness.get("total"),
+        non_harness.get("percentage"),
+        harness.get("hit"),
+        harness.get("total"),
+        harness.get("percentage"),
+    )
+
+
+def _flatten_coverage(coverage: Dict[str, Any]) -> Dict[str, Any]:
+    return dict(zip(_COV_KEYS, _flat_coverage_values(coverage)))
+
+
+# Coverage per proof_dir for this process: JSONL files that span several runs
+# repeat the same proof dirs, and re-reading the report dominates fix_coverage.
+_coverage_cache: Dict[str, Dict[str, Any]] = {}
+
+
+def _read_coverage_cached(proof_dir: str) -> Dict[str, Any]:
+    global _read_coverage_metrics
+    coverage = _coverage_cache.get(proof_dir)
+    if coverage is None:
+        if _read_coverage_metrics is None:
+            if str(SCRIPT_DIR) not in sys.path:
+                sys.path.insert(0, str(SCRIPT_DIR))
+            try:
+                from codexup import read_coverage_metrics as _read_coverage_metrics
+            except Exception as exc:  # pragma: no cover - import guard for CLI use
+                raise SystemExit(f"Failed to import codexup.py: {exc}")
+        coverage = _coverage_cache[proof_dir] = _read_coverage_metrics(proof_dir)
+    # Each record gets its own copy so later fixers can't alias other records.
+    return {k: dict(v) if isinstance(v, dict) else v for k, v in coverage.items()}
 
 
 def fix_coverage(record: Record, _ctx: Dict[str, Any]) -> bool:
     proof_dir = record.get("proof_dir")
     if not isinstance(proof_dir, str) or not proof_dir:
         return False
-    coverage = read_coverage_metrics(proof_dir)
+    coverage = _read_coverage_cached(proof_dir)
 
     changed = False
     if isinstance(record.get("coverage"), dict) or "coverage" in record:
         record["coverage"] = coverage
         changed = True
 
-    flattened = _flatten_coverage(coverage)
-    if any(k.startswith("coverage.") for k in record.keys()):
-        for key, value in flattened.items():
-            if record.get(key) != value:
+    if not _FLAT_COV_KEYS.isdisjoint(record):
+        # Compare the flat columns in place without building a dict.
+        rget = record.get
+        for key, value in zip(_COV_KEYS, _flat_coverage_values(coverage)):
+            if rget(key) != value:
                 record[key] = value
                 changed = True
 
@@ -63,6 +142,73 @@ def fix_coverage(record: Record, _ctx: Dict[str, Any]) -> bool:
     return changed
 
 
+def _is_plain_abs_path(value: str) -> bool:
+    # Absolute POSIX path that Path() would leave unchanged (no //, /./ or trailing /).
+    return (
+        value.startswith("/")
+        and "//" not in value
+        and "/./" not in value
+        and not value.endswith(("/", "/."))
+    )
+
+
+@functools.lru_cache(maxsize=4096)
+def _reroot_path_slow(value: str, old_root: str, new_root: str) -> str:
+    try:
+        p = Path(value)
+    except Exception:
+        return value
+    try:
+        rel = p.relative_to(old_root)
+    except Exception:
+        return value
+    return str(Path(new_root) / rel)
+
+
+def _reroot_path(value: str, old_root: str, new_root: str) -> str:
+    """Move `value` from under old_root to under new_root; other paths are returned as is."""
+    if _POSIX_PATHS and old_root.startswith("/") and new_root.startswith("/") and _is_plain_abs_path(value):
+        # Plain string prefix test, matching what Path.relative_to would decide.
+        prefix = old_root if old_root.endswith("/") else old_root + "/"
+        if value.startswith(prefix):
+            rest = value[len(prefix):]
+            return (new_root if new_root.endswith("/") else new_root + "/") + rest
+        if value != old_root:
+            return value
+    return _reroot_path_slow(value, old_root, new_root)
+
+
+def _rewrite_path(value: Any, old_root: str, new_root: str) -> Any:
+    if not isinstance(value, str) or not value:
+        return value
+    return _reroot_path(value, old_root, new_root)
+
+
+# Top-level record keys holding paths under the run root.
+_PATH_KEYS = ("log_path", "coverage_path", "verification_result_path", "session_path")
+
+
+def _already_under_root(record: Record, proof_dir: str, new_root: str) -> bool:
+    """True when fix_paths would leave the record unchanged (typical for re-runs).
+
+    That holds when proof_dir already sits directly in new_root and every path
+    field is a plain absolute path, since re-rooting onto the same root then
+    only matters for paths Path() would normalize.
+    """
+    if not (_POSIX_PATHS and new_root.startswith("/") and _is_plain_abs_path(proof_dir)):
+        return False
+    if proof_dir.rpartition("/")[0] != new_root:
+        return False
+    coverage = record.get("coverage")
+    verification = record.get("verification")
+    values = [record.get(key) for key in _PATH_KEYS]
+    values.append(coverage.get("coverage_path") if isinstance(coverage, dict) else None)
+    values.append(verification.get("result_path") if isinstance(verification, dict) else None)
+    values.append(record.get("coverage.coverage_path"))
+    values.append(record.get("verification.result_path"))
+    return all(not isinstance(v, str) or not v or _is_plain_abs_path(v) for v in values)
+
+
 def fix_paths(record: Record, ctx: Dict[str, Any]) -> bool:
     proof_dir = record.get("proof_dir")
     if not isinstance(proof_dir, str) or not proof_dir:
@@ -72,6 +218,10 @@ def fix_paths(record: Record, ctx: Dict[str, Any]) -> bool:
     if not isinstance(new_root, Path):
         return False
 
+    new_root_s = str(new_root)
+    if _already_under_root(record, proof_dir, new_root_s):
+        return False
+
     old_proof = Path(proof_dir)
     old_root = old_proof.parent
     new_proof = new_root / old_proof.name
@@ -81,30 +231,20 @@ def fix_paths(record: Record, ctx: Dict[str, Any]) -> bool:
         record["proof_dir"] = str(new_proof)
         changed = True
 
-    def _rewrite_path(value: Any) -> Any:
-        if not isinstance(value, str) or not value:
-            return value
-        try:
-            p = Path(value)
-        except Exception:
-            return value
-        try:
-            p.relative_to(old_root)
-        except Exception:
-            return value
-        return str(new_root / p.relative_to(old_root))
+    old_root_s = str(old_root)
 
-    for key in ("log_path", "coverage_path", "verification_result_path", "session_path"):
+    for key in _PATH_KEYS:
         if key in record:
-            new_val = _rewrite_path(record.get(key))
-            if new_val != record.get(key):
+            old_val = record[key]
+            new_val = _rewrite_path(old_val, old_root_s, new_root_s)
+            if new_val != old_val:
                 record[key] = new_val
                 changed = True
 
     coverage = record.get("coverage")
     if isinstance(coverage, dict):
         cov_path = coverage.get("coverage_path")
-        new_cov = _rewrite_path(cov_path)
+        new_cov = _rewrite_path(cov_path, old_root_s, new_root_s)
         if new_cov != cov_path:
             coverage["coverage_path"] = new_cov
             changed = True
@@ -112,19 +252,19 @@ def fix_paths(record: Record, ctx: Dict[str, Any]) -> bool:
     verification = record.get("verification")
     if isinstance(verification, dict):
         res_path = verification.get("result_path")
-        new_res = _rewrite_path(res_path)
+        new_res = _rewrite_path(res_path, old_root_s, new_root_s)
         if new_res != res_path:
             verification["result_path"] = new_res
             changed = True
 
     flat_cov_path = record.get("coverage.coverage_path")
-    new_flat_cov = _rewrite_path(flat_cov_path)
+    new_flat_cov = _rewrite_path(flat_cov_path, old_root_s, new_root_s)
     if new_flat_cov != flat_cov_path:
         record["coverage.coverage_path"] = new_flat_cov
         changed = True
 
     flat_ver_path = record.get("verification.result_path")
-    new_flat_ver = _rewrite_path(flat_ver_path)
+    new_flat_ver = _rewrite_path(flat_ver_path, old_root_s, new_root_s)
     if new_flat_ver != flat_ver_path:
         record["verification.result_path"] = new_flat_ver
         changed = True
@@ -136,6 +276,8 @@ AVAILABLE_FIXERS: Dict[str, Fixer] = {
     "coverage": fix_coverage,
     "paths": fix_paths,
 }
+# Fixers that leave a record alone unless it has a "proof_dir" key.
+_PROOF_DIR_FIXERS = frozenset({fix_coverage, fix_paths})
 
 
 def select_fixers(names: Iterable[str]) -> List[Fixer]:
@@ -147,27 +289,122 @@ def select_fixers(names: Iterable[str]) -> List[Fixer]:
         ordered = requested
 
     fixers: List[Fixer] = []
+    get = AVAILABLE_FIXERS.get
     for name in ordered:
-        fixer = AVAILABLE_FIXERS.get(name)
+        fixer = get(name)
         if fixer is None:
             raise SystemExit(f"Unknown fixer: {name}. Available: {', '.join(AVAILABLE_FIXERS)}")
         fixers.append(fixer)
     return fixers
 
 
-def _open_output(in_path: Path, in_place: bool, suffix: str) -> Tuple[Path, Any]:
+def _named_tmp_output(in_path: Path) -> Any:
+    return tempfile.NamedTemporaryFile(
+        mode="wb",
+        buffering=_IO_BUFFER_BYTES,
+        delete=False,
+        dir=str(in_path.parent),
+        prefix=in_path.name + ".",
+        suffix=".tmp",
+    )
+
+
+def _open_output(in_path: Path, in_place: bool, suffix: str) -> Tuple[Optional[Path], Any]:
+    """Open the output stream; a None path means an unnamed O_TMPFILE to publish later."""
     if in_place:
-        tmp = tempfile.NamedTemporaryFile(
-            mode="w",
-            encoding="utf-8",
-            delete=False,
-            dir=str(in_path.parent),
-            prefix=in_path.name + ".",
-            suffix=".tmp",
-        )
+        global _USE_O_TMPFILE
+        if _USE_O_TMPFILE:
+            try:
+                fd = os.open(str(in_path.parent), os.O_TMPFILE | os.O_RDWR, 0o600)
+            except OSError:
+                _USE_O_TMPFILE = False
+            else:
+                return None, os.fdopen(fd, "wb", buffering=_IO_BUFFER_BYTES)
+        tmp = _named_tmp_output(in_path)
         return Path(tmp.name), tmp
     out_path = in_path.with_name(in_path.name + suffix)
-    return out_path, out_path.open("w", encoding="utf-8")
+    return out_path, out_path.open("wb", buffering=_IO_BUFFER_BYTES)
+
+
+def _publish_output(out_fh: Any, in_path: Path) -> Path:
+    """Give a finished O_TMPFILE output a name next to in_path and return it."""
+    global _USE_O_TMPFILE
+    out_fh.flush()
+    tmp_path = in_path.with_name(f"{in_path.name}.{os.getpid()}.tmp")
+    try:
+        tmp_path.unlink(missing_ok=True)
+        os.link(f"/proc/self/fd/{out_fh.fileno()}", tmp_path, follow_symlinks=True)
+        return tmp_path
+    except OSError:
+        # No usable /proc link here; copy into a named temp file and stop trying.
+        _USE_O_TMPFILE = False
+    with _named_tmp_output(in_path) as named:
+        _copy_range(out_fh.fileno(), named.fileno(), 0, os.fstat(out_fh.fileno()).st_size)
+        return Path(named.name)
+
+
+class _PassThrough:
+    """Copy runs of unchanged input lines to the output.
+
+    Short runs go through the output's write buffer. Once a run reaches
+    _COPY_RANGE_MIN_BYTES it is copied by byte range from the input fd
+    (os.copy_file_range where available) instead of through Python.
+    """
+
+    def __init__(self, in_fd: int, out_fh: Any) -> None:
+        self.in_fd = in_fd
+        self.out_fh = out_fh
+        self.start = 0
+        self.length = 0
+        self.lines: Optional[List[bytes]] = []
+
+    def add(self, line: bytes, line_start: int) -> None:
+        if self.out_fh is None:
+            return
+        if not self.length:
+            self.start = line_start
+            self.lines = []
+        self.length += len(line)
+        if self.lines is not None:
+            self.lines.append(line)
+            if self.length >= _COPY_RANGE_MIN_BYTES:
+                self.lines = None
+
+    def flush(self) -> None:
+        if not self.length:
+            return
+        if self.lines is not None:
+            self.out_fh.write(b"".join(self.lines))
+        else:
+            self.out_fh.flush()
+            _copy_range(self.in_fd, self.out_fh.fileno(), self.start, self.length)
+        self.length = 0
+        self.lines = []
+
+
+def _copy_range(in_fd: int, out_fd: int, offset: int, count: int) -> None:
+    """Append `count` bytes of in_fd starting at `offset` to out_fd's current position."""
+    copy_file_range = getattr(os, "copy_file_range", None)
+    if copy_file_range is not None:
+        try:
+            while count > 0:
+                n = copy_file_range(in_fd, out_fd, count, offset)
+                if n == 0:
+                    break
+                offset += n
+                count -= n
+        except OSError:
+            # Unsupported across these filesystems; finish with plain reads and writes.
+            pass
+    while count > 0:
+        chunk = os.pread(in_fd, min(count, _IO_BUFFER_BYTES), offset)
+        if not chunk:
+            break
+        view = memoryview(chunk)
+        while view:
+            view = view[os.write(out_fd, view):]
+        offset += len(chunk)
+        count -= len(chunk)
 
 
 def process_file(
@@ -176,9 +413,11 @@ def process_file(
     in_place: bool,
     suffix: str,
     dry_run: bool,
-) -> Tuple[int, int]:
+) -> Tuple[int, int, int]:
+    """Fix one metrics file; returns (parsed records, changed records, unparsed copies)."""
     total = 0
     changed = 0
+    unparsed = 0
 
     out_path = None
     out_fh = None
@@ -186,41 +425,69 @@ def process_file(
         out_path, out_fh = _open_output(in_path, in_place, suffix)
 
     ctx = {"metrics_path": in_path, "run_root": in_path.parent.parent}
+    # Cheap pre-filter: if every fixer needs proof_dir, an object line that never
+    # mentions it is copied through without being parsed. Such lines are counted
+    # apart from `total`, since an unparsed line may not be valid JSON.
+    skip_without_proof_dir = all(fixer in _PROOF_DIR_FIXERS for fixer in fixers)
 
     try:
-        with in_path.open("r", encoding="utf-8") as f:
+        # Records stay bytes end to end. Unchanged lines are copied verbatim:
+        # short runs through the write buffer, long runs kernel-side by offset.
+        with in_path.open("rb", buffering=_IO_BUFFER_BYTES) as f:
+            passthrough = _PassThrough(f.fileno(), out_fh)
+            # Bind per-line lookups once; most runs use a single fixer.
+            keep = passthrough.add
+            loads = _json_loads
+            local_fixers = tuple(fixers)
+            only_fixer = local_fixers[0] if len(local_fixers) == 1 else None
+            offset = 0
             for line in f:
-                if not line.strip():
-                    if out_fh:
-                        out_fh.write(line)
+                line_start = offset
+                offset += len(line)
+                stripped = line.strip()
+                if not stripped:
+                    keep(line, line_start)
+                    continue
+
+                if (
+                    skip_without_proof_dir
+                    and b'"proof_dir"' not in line
+                    and stripped.startswith(b"{")
+                    and stripped.endswith(b"}")
+                ):
+                    unparsed += 1
+                    keep(line, line_start)
                     continue
 
                 try:
-                    record = json.loads(line)
+                    record = loads(line)
                 except Exception:
-                    if out_fh:
-                        out_fh.write(line)
+                    keep(line, line_start)
                     continue
 
                 if not isinstance(record, dict):
-                    if out_fh:
-                        out_fh.write(line)
+                    keep(line, line_start)
                     continue
 
                 total += 1
-                did_change = False
-                for fixer in fixers:
-                    if fixer(record, ctx):
-                        did_change = True
+                if only_fixer is not None:
+                    did_change = only_fixer(record, ctx)
+                else:
+                    did_change = False
+                    for fixer in local_fixers:
+                        if fixer(record, ctx):
+                            did_change = True
 
                 if did_change:
                     changed += 1
-
-                if out_fh:
-                    if did_change:
-                        out_fh.write(json.dumps(record, ensure_ascii=True) + "\n")
-                    else:
-                        out_fh.write(line)
+                    passthrough.flush()
+                    if out_fh:
+                        out_fh.write(_json_dumps_line(record))
+                else:
+                    keep(line, line_start)
+            passthrough.flush()
+        if out_fh and out_path is None:
+            out_path = _publish_output(out_fh, in_path)
     finally:
         if out_fh:
             out_fh.close()
@@ -232,7 +499,18 @@ def process_file(
         in_path.replace(backup_path)
         out_path.replace(in_path)
 
-    return total, changed
+    return total, changed, unparsed
+
+
+def _process_file_by_name(
+    in_path: Path,
+    fixer_names: List[str],
+    in_place: bool,
+    suffix: str,
+    dry_run: bool,
+) -> Tuple[int, int, int]:
+    # Worker entry point: fixers are passed by name so the call pickles cleanly.
+    return process_file(in_path, select_fixers(fixer_names), in_place, suffix, dry_run)
 
 
 def main() -> None:
@@ -265,7 +543,8 @@ def main() -> None:
     )
     args = parser.parse_args()
 
-    fixers = select_fixers(args.only)
+    # Validate fixer names up front; workers resolve them again by name.
+    select_fixers(args.only)
     in_place = True
 
     paths: List[str] = list(args.paths or [])
@@ -283,36 +562,61 @@ def main() -> None:
     if not paths:
         raise SystemExit("No input paths provided. Use paths or --paths-file.")
 
-    for p in paths:
-        path = Path(p)
-        if not path.exists():
-            print(f"[codexup] missing: {path}")
-            continue
-        if args.revert:
-            backup_path = path.with_name(path.name + ".old")
-            if not backup_path.exists():
-                print(f"[codexup] missing backup: {backup_path}")
-                continue
-            if args.dry_run:
-                print(f"[codexup] {path}: would restore from {backup_path}")
-                continue
-            path.replace(path.with_name(path.name + ".broken"))
-            backup_path.replace(path)
-            print(f"[codexup] {path}: restored from {backup_path}")
-            continue
-        total, changed = process_file(
-            path,
-            fixers,
-            in_place,
-            args.suffix,
-            args.dry_run,
-        )
+    def _report(path: Path, result: Any) -> None:
+        if isinstance(result, str):
+            print(result)
+            return
+        total, changed, unparsed = result.result() if isinstance(result, Future) else result
+        unparsed_note = f" ({unparsed} lines without proof_dir copied unparsed)" if unparsed else ""
         if args.dry_run:
-            print(f"[codexup] {path}: would change {changed}/{total} records")
+            print(f"[codexup] {path}: would change {changed}/{total} records{unparsed_note}")
         else:
             out_note = "in-place"
             out_note += f" (backup {path.with_name(path.name + '.old')})"
-            print(f"[codexup] {path}: changed {changed}/{total} records {out_note}")
+            print(f"[codexup] {path}: changed {changed}/{total} records{unparsed_note} {out_note}")
+
+    # Files are independent, so fix them in worker processes when there are
+    # several; results are still reported in input order. A file listed twice
+    # (under any spelling) must be fixed twice in turn, so that runs serially.
+    to_process = [os.path.realpath(p) for p in paths if not args.revert and Path(p).exists()]
+    workers = min(len(to_process), os.cpu_count() or 1)
+    pool = None
+    if workers > 1 and len(set(to_process)) == len(to_process):
+        pool = ProcessPoolExecutor(max_workers=workers)
+
+    try:
+        pending: List[Tuple[Path, Any]] = []
+        for p in paths:
+            path = Path(p)
+            if not path.exists():
+                result: Any = f"[codexup] missing: {path}"
+            elif args.revert:
+                backup_path = path.with_name(path.name + ".old")
+                if not backup_path.exists():
+                    result = f"[codexup] missing backup: {backup_path}"
+                elif args.dry_run:
+                    result = f"[codexup] {path}: would restore from {backup_path}"
+                else:
+                    path.replace(path.with_name(path.name + ".broken"))
+                    backup_path.replace(path)
+                    result = f"[codexup] {path}: restored from {backup_path}"
+            elif pool is not None:
+                result = pool.submit(
+                    _process_file_by_name, path, args.only, in_place, args.suffix, args.dry_run
+                )
+            else:
+                result = _process_file_by_name(path, args.only, in_place, args.suffix, args.dry_run)
+
+            if pool is None:
+                _report(path, result)
+            else:
+                pending.append((path, result))
+
+        for path, result in pending:
+            _report(path, result)
+    finally:
+        if pool is not None:
+            pool.shutdown()
 
 
 if __name__ == "__main__":
@@ -2,78 +2,114 @@
 import argparse
 import csv
 import json
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Dict, List, Optional
-
-
-def summarize_metrics(metrics: List[Dict[str, Any]]) -> Dict[str, Any]:
-    if not metrics:
-        return {}
-
-    total = len(metrics)
-    compile_success = sum(1 for m in metrics if m.get("compile_success"))
-    coverage_over_90 = sum(
-        1 for m in metrics
-        if (m.get("coverage") or {}).get("overall") is not None
-        and ((m.get("coverage") or {}).get("overall", {}).get("percentage") is not None)
-        and (m.get("coverage") or {}).get("overall", {}).get("percentage") >= 0.9
-    )
-    zero_errors = sum(1 for m in metrics if m.get("verification", {}).get("error_count") == 0)
-    avg_time = sum(m.get("duration_sec", 0) for m in metrics) / total
-
-    token_totals = {
-        "input_tokens": 0,
-        "output_tokens": 0,
-        "cached_tokens": 0,
-        "reasoning_tokens": 0,
-        "total_tokens": 0,
-    }
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
+
+
+def _json_loads(data: bytes) -> Any:
+    """Decode one JSONL record, using orjson when it is installed."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is strict (no NaN/Infinity); let json decide what is valid.
+            pass
+    return json.loads(data)
+
+
+_TOKEN_KEYS = ("input_tokens", "output_tokens", "cached_tokens", "reasoning_tokens", "total_tokens")
+_COST_KEYS = ("input_cost", "output_cost", "cached_cost", "reasoning_cost", "total_cost")
+# Shared read-only stand-in for missing sub-dicts; never mutated.
+_EMPTY_DICT: Dict[str, Any] = {}
+
+
+@dataclass(slots=True)
+class MetricsAccumulator:
+    """Running totals for summarize_metrics, fed one record at a time."""
+
+    total: int = 0
+    compile_success: int = 0
+    coverage_over_90: int = 0
+    zero_errors: int = 0
+    duration_sum: float = 0
+    token_totals: Dict[str, int] = field(default_factory=lambda: dict.fromkeys(_TOKEN_KEYS, 0))
+    cost_totals: Dict[str, float] = field(default_factory=lambda: dict.fromkeys(_COST_KEYS, 0.0))
+    any_cost: bool = False
+
+    def add(self, m: Dict[str, Any]) -> None:
+        self.total += 1
+        if m.get("compile_success"):
+            self.compile_success += 1
+        overall = (m.get("coverage") or _EMPTY_DICT).get("overall")
+        if overall is not None:
+            pct = overall.get("percentage")
+            if pct is not None and pct >= 0.9:
+                self.coverage_over_90 += 1
+        if m.get("verification", _EMPTY_DICT).get("error_count") == 0:
+            self.zero_errors += 1
+        self.duration_sum += m.get("duration_sec", 0)
+
+        tokens = m.get("tokens")
+        if tokens:
+            token_totals = self.token_totals
+            for k in _TOKEN_KEYS:
+                v = tokens.get(k)
+                if isinstance(v, int):
+                    token_totals[k] += v
+
+        costs = m.get("costs")
+        if costs:
+            cost_totals = self.cost_totals
+            for k in _COST_KEYS:
+                v = costs.get(k)
+                if isinstance(v, (int, float)):
+                    cost_totals[k] += float(v)
+                    self.any_cost = True
+
+    def summary(self) -> Dict[str, Any]:
+        total = self.total
+        if not total:
+            return {}
+        return {
+            "targets_total": total,
+            "compile_success_rate": self.compile_success / total,
+            "coverage_over_90_rate": self.coverage_over_90 / total,
+            "zero_final_errors_rate": self.zero_errors / total,
+            "avg_generation_time_sec": self.duration_sum / total,
+            "token_totals": self.token_totals,
+            "cost_totals": self.cost_totals if self.any_cost else None,
+        }
+
+
+def summarize_metrics(metrics: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    acc = MetricsAccumulator()
     for m in metrics:
-        tokens = m.get("tokens") or {}
-        for k in token_totals:
-            v = tokens.get(k)
-            if isinstance(v, int):
-                token_totals[k] += v
-
-    cost_totals = {
-        "input_cost": 0.0,
-        "output_cost": 0.0,
-        "cached_cost": 0.0,
-        "reasoning_cost": 0.0,
-        "total_cost": 0.0,
-    }
-    any_cost = False
-    for m in metrics:
-        costs = m.get("costs") or {}
-        for k in cost_totals:
-            v = costs.get(k)
-            if isinstance(v, (int, float)):
-                cost_totals[k] += float(v)
-                any_cost = True
-
-    return {
-        "targets_total": total,
-        "compile_success_rate": compile_success / total,
-        "coverage_over_90_rate": coverage_over_90 / total,
-        "zero_final_errors_rate": zero_errors / total,
-        "avg_generation_time_sec": avg_time,
-        "token_totals": token_totals,
-        "cost_totals": cost_totals if any_cost else None,
-    }
+        acc.add(m)
+    return acc.summary()
 
 
-def load_metrics_jsonl(path: Path) -> List[Dict[str, Any]]:
-    metrics: List[Dict[str, Any]] = []
-    with path.open("r", encoding="utf-8") as f:
+def iter_metrics_jsonl(path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield records from a metrics JSONL file, skipping blank and invalid lines."""
+    with path.open("rb") as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
             try:
-                metrics.append(json.loads(line))
+                record = _json_loads(line)
             except Exception:
                 continue
-    return metrics
+            yield record
+
+
+def load_metrics_jsonl(path: Path) -> List[Dict[str, Any]]:
+    return list(iter_metrics_jsonl(path))
 
 
 def _get_nested(obj: Dict[str, Any], *keys: str) -> Optional[Any]:
@@ -85,82 +121,79 @@ def _get_nested(obj: Dict[str, Any], *keys: str) -> Optional[Any]:
     return cur
 
 
-def write_metrics_csv(metrics: List[Dict[str, Any]], out_path: Path) -> None:
-    columns = [
-        "function",
-        "proof_dir",
-        "log_path",
-        "run_id",
-        "session_path",
-        "success",
-        "exit_code",
-        "duration_sec",
-        "compile_success",
-        "preflight_error",
-        "coverage_path",
-        "coverage_overall_percentage",
-        "coverage_overall_total_lines",
-        "coverage_overall_hit_lines",
-        "coverage_non_harness_percentage",
-        "coverage_non_harness_total_lines",
-        "coverage_non_harness_hit_lines",
-        "coverage_harness_percentage",
-        "coverage_harness_total_lines",
-        "coverage_harness_hit_lines",
-        "verification_result_path",
-        "verification_error_count",
-        "tokens_input",
-        "tokens_cached",
-        "tokens_output",
-        "tokens_reasoning",
-        "tokens_total",
-        "cost_input",
-        "cost_cached",
-        "cost_output",
-        "cost_reasoning",
-        "cost_total",
-    ]
-
+def _path_getter(keys: Tuple[str, ...]) -> Callable[[Dict[str, Any]], Any]:
+    """Build a getter for a fixed key path; same result as _get_nested(m, *keys)."""
+    if len(keys) == 1:
+        (a,) = keys
+        return lambda m: m.get(a)
+    if len(keys) == 2:
+        a, b = keys
+
+        def _get2(m: Dict[str, Any]) -> Any:
+            x = m.get(a)
+            return x.get(b) if isinstance(x, dict) else None
+
+        return _get2
+    if len(keys) == 3:
+        a, b, c = keys
+
+        def _get3(m: Dict[str, Any]) -> Any:
+            x = m.get(a)
+            if not isinstance(x, dict):
+                return None
+            x = x.get(b)
+            return x.get(c) if isinstance(x, dict) else None
+
+        return _get3
+    return lambda m: _get_nested(m, *keys)
+
+
+# CSV column -> key path into a metrics record.
+_CSV_SPEC: Tuple[Tuple[str, Tuple[str, ...]], ...] = (
+    ("function", ("function",)),
+    ("proof_dir", ("proof_dir",)),
+    ("log_path", ("log_path",)),
+    ("run_id", ("run_id",)),
+    ("session_path", ("session_path",)),
+    ("success", ("success",)),
+    ("exit_code", ("exit_code",)),
+    ("duration_sec", ("duration_sec",)),
+    ("compile_success", ("compile_success",)),
+    ("preflight_error", ("preflight_error",)),
+    ("coverage_path", ("coverage", "coverage_path")),
+    ("coverage_overall_percentage", ("coverage", "overall", "percentage")),
+    ("coverage_overall_total_lines", ("coverage", "overall", "total")),
+    ("coverage_overall_hit_lines", ("coverage", "overall", "hit")),
+    ("coverage_non_harness_percentage", ("coverage", "non_harness", "percentage")),
+    ("coverage_non_harness_total_lines", ("coverage", "non_harness", "total")),
+    ("coverage_non_harness_hit_lines", ("coverage", "non_harness", "hit")),
+    ("coverage_harness_percentage", ("coverage", "harness", "percentage")),
+    ("coverage_harness_total_lines", ("coverage", "harness", "total")),
+    ("coverage_harness_hit_lines", ("coverage", "harness", "hit")),
+    ("verification_result_path", ("verification", "result_path")),
+    ("verification_error_count", ("verification", "error_count")),
+    ("tokens_input", ("tokens", "input_tokens")),
+    ("tokens_cached", ("tokens", "cached_tokens")),
+    ("tokens_output", ("tokens", "output_tokens")),
+    ("tokens_reasoning", ("tokens", "reasoning_tokens")),
+    ("tokens_total", ("tokens", "total_tokens")),
+    ("cost_input", ("costs", "input_cost")),
+    ("cost_cached", ("costs", "cached_cost")),
+    ("cost_output", ("costs", "output_cost")),
+    ("cost_reasoning", ("costs", "reasoning_cost")),
+    ("cost_total", ("costs", "total_cost")),
+)
+CSV_COLUMNS = [col for col, _keys in _CSV_SPEC]
+_CSV_GETTERS = tuple(_path_getter(keys) for _col, keys in _CSV_SPEC)
+
+
+def write_metrics_csv(metrics: Iterable[Dict[str, Any]], out_path: Path) -> None:
     out_path.parent.mkdir(parents=True, exist_ok=True)
     with out_path.open("w", encoding="utf-8", newline="") as f:
-        writer = csv.DictWriter(f, fieldnames=columns)
-        writer.writeheader()
-        for m in metrics:
-            row = {
-                "function": m.get("function"),
-                "proof_dir": m.get("proof_dir"),
-                "log_path": m.get("log_path"),
-                "run_id": m.get("run_id"),
-                "session_path": m.get("session_path"),
-                "success": m.get("success"),
-                "exit_code": m.get("exit_code"),
-                "duration_sec": m.get("duration_sec"),
-                "compile_success": m.get("compile_success"),
-                "preflight_error": m.get("preflight_error"),
-                "coverage_path": _get_nested(m, "coverage", "coverage_path"),
-                "coverage_overall_percentage": _get_nested(m, "coverage", "overall", "percentage"),
-                "coverage_overall_total_lines": _get_nested(m, "coverage", "overall", "total"),
-                "coverage_overall_hit_lines": _get_nested(m, "coverage", "overall", "hit"),
-                "coverage_non_harness_percentage": _get_nested(m, "coverage", "non_harness", "percentage"),
-                "coverage_non_harness_total_lines": _get_nested(m, "coverage", "non_harness", "total"),
-                "coverage_non_harness_hit_lines": _get_nested(m, "coverage", "non_harness", "hit"),
-                "coverage_harness_percentage": _get_nested(m, "coverage", "harness", "percentage"),
-                "coverage_harness_total_lines": _get_nested(m, "coverage", "harness", "total"),
-                "coverage_harness_hit_lines": _get_nested(m, "coverage", "harness", "hit"),
-                "verification_result_path": _get_nested(m, "verification", "result_path"),
-                "verification_error_count": _get_nested(m, "verification", "error_count"),
-                "tokens_input": _get_nested(m, "tokens", "input_tokens"),
-                "tokens_cached": _get_nested(m, "tokens", "cached_tokens"),
-                "tokens_output": _get_nested(m, "tokens", "output_tokens"),
-                "tokens_reasoning": _get_nested(m, "tokens", "reasoning_tokens"),
-                "tokens_total": _get_nested(m, "tokens", "total_tokens"),
-                "cost_input": _get_nested(m, "costs", "input_cost"),
-                "cost_cached": _get_nested(m, "costs", "cached_cost"),
-                "cost_output": _get_nested(m, "costs", "output_cost"),
-                "cost_reasoning": _get_nested(m, "costs", "reasoning_cost"),
-                "cost_total": _get_nested(m, "costs", "total_cost"),
-            }
-            writer.writerow(row)
+        # Columns are fixed, so write positional rows and skip DictWriter's per-row dict.
+        writer = csv.writer(f)
+        writer.writerow(CSV_COLUMNS)
+        writer.writerows(tuple(get(m) for get in _CSV_GETTERS) for m in metrics)
 
 
 def main() -> None:
@@ -180,8 +213,17 @@ def main() -> None:
     if not metrics_path.exists():
         raise SystemExit(f"Metrics file not found: {metrics_path}")
 
-    metrics = load_metrics_jsonl(metrics_path)
-    summary = summarize_metrics(metrics)
+    # One streaming pass: each record is folded into the summary as its CSV row is written.
+    acc = MetricsAccumulator()
+
+    def _accumulate(records: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        for m in records:
+            acc.add(m)
+            yield m
+
+    csv_path = Path(args.csv) if args.csv else metrics_path.with_suffix(".csv")
+    write_metrics_csv(_accumulate(iter_metrics_jsonl(metrics_path)), csv_path)
+    summary = acc.summary()
 
     if args.out:
         out_path = Path(args.out)
@@ -194,9 +236,6 @@ def main() -> None:
         out_path = metrics_path.with_name(f"{summary_stem}.json")
     out_path.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
     print(f"[codexup] wrote summary: {out_path}")
-
-    csv_path = Path(args.csv) if args.csv else metrics_path.with_suffix(".csv")
-    write_metrics_csv(metrics, csv_path)
     print(f"[codexup] wrote csv: {csv_path}")
 
 
@@ -2,201 +2,75 @@
 import argparse
 import json
 import csv
-import os
-import subprocess
-import re
+import operator
 from collections import OrderedDict
 from pathlib import Path
 from typing import Any, Dict, Iterable, List, Optional
 
+from _proof_dir_cache import (
+    ProofSummary,
+    ProofSummaryCache,
+    coverage_path_from_proof_dir,
+    load_coverage,
+    summarize_coverage,
+    summarize_proof_dir,
+)
 
-PRECONDITION_PAT = re.compile(r"__CPROVER_precondition|CBMC_PRECONDITION|__CPROVER_assume")
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None
 
 
-def _get_nested(obj: Dict[str, Any], *keys: str) -> Optional[Any]:
-    cur: Any = obj
-    for key in keys:
-        if not isinstance(cur, dict):
-            return None
-        cur = cur.get(key)
-    return cur
+# Rows are small; a large buffer turns one write per row into a few big syscalls.
+_IO_BUFFER_BYTES = 1 << 20
 
 
-def _read_json(path: Path) -> Optional[Dict[str, Any]]:
-    try:
-        with path.open("r", encoding="utf-8") as f:
-            return json.load(f)
-    except Exception:
-        return None
-
-
-def _safe_read_text(path: Path) -> str:
-    try:
-        return path.read_text(encoding="utf-8", errors="ignore")
-    except Exception:
-        return ""
-
-
-def _count_preconditions(files: List[Path]) -> int:
-    c = 0
-    for f in files:
-        c += len(PRECONDITION_PAT.findall(_safe_read_text(f)))
-    return c
-
-
-def _gather_scope_files(proof_dir: Path) -> List[Path]:
-    leaf = list(proof_dir.rglob("*.c")) + list(proof_dir.rglob("*.h"))
-
-    parent = proof_dir.parent
-    parent_add: List[Path] = []
-    if parent.is_dir():
-        for p in parent.iterdir():
-            if not p.is_file():
-                continue
-            if p.suffix.lower() not in (".c", ".h"):
-                continue
-            n = p.name.lower()
-            if n == "general-stubs.c" or "stub" in n or "model" in n:
-                parent_add.append(p)
-
-    seen = set()
-    out: List[Path] = []
-    for p in leaf + parent_add:
-        rp = str(p.resolve())
-        if rp not in seen:
-            seen.add(rp)
-            out.append(p)
-    return out
-
-
-
-
-def _coverage_path_from_proof_dir(proof_dir: str) -> Path:
-    return Path(proof_dir) / "build" / "report" / "json" / "viewer-coverage.json"
-
-
-def _count_harness_size(coverage_path: Path) -> Optional[int]:
-    data = _read_json(coverage_path)
-    if not isinstance(data, dict):
-        return None
-
-    viewer = data.get("viewer-coverage", {})
-    coverage = viewer.get("coverage", {})
-    if not isinstance(coverage, dict):
-        return None
-
-    total = 0
-    for file_path, funcs in coverage.items():
-        if not str(file_path).endswith("_harness.c"):
-            continue
-        if not isinstance(funcs, dict):
-            continue
-        for _func, lines in funcs.items():
-            if not isinstance(lines, dict):
-                continue
-            total += len(lines)
-    return total
-
-
-def _count_program_files(coverage_path: Path) -> Optional[int]:
-    data = _read_json(coverage_path)
-    if not isinstance(data, dict):
-        return None
-
-    viewer = data.get("viewer-coverage", {})
-    coverage = viewer.get("coverage", {})
-    if not isinstance(coverage, dict):
-        return None
-
-    count = 0
-    for file_path in coverage.keys():
-        if str(file_path).endswith("_harness.c"):
-            continue
-        count += 1
-    return count
-
-
-def _count_harness_stub_functions_ctags(proof_dir: Path) -> Optional[int]:
-    harness_files = list(proof_dir.rglob("*_harness.c"))
-    if not harness_files:
-        return 0
-
-    total = 0
-    for path in harness_files:
+def _json_loads(data: bytes) -> Any:
+    """Decode one JSONL record, using orjson when it is installed."""
+    if orjson is not None:
         try:
-            result = subprocess.run(
-                ["ctags", "-x", "--c-kinds=f", str(path)],
-                capture_output=True,
-                text=True,
-                check=False,
-            )
-        except Exception:
-            return None
-
-        if result.returncode != 0:
-            return None
-
-        count = 0
-        for line in result.stdout.splitlines():
-            line = line.strip()
-            if not line:
-                continue
-            name = line.split()[0]
-            if name == "harness":
-                continue
-            if name.startswith("__CPROVER_nondet_"):
-                continue
-            if name.startswith("_assert_") or name.startswith("__assert_"):
-                continue
-            count += 1
-        total += count
-    return total
-
-
-def _parse_loop_limits(proof_dir: Path) -> Dict[str, Optional[int]]:
-    makefile = proof_dir / "Makefile"
-    try:
-        text = makefile.read_text(encoding="utf-8", errors="ignore")
-    except Exception:
-        return {"custom_loop_limits": None, "max_loop_limit": None}
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is strict (no NaN/Infinity); let json decide what is valid.
+            pass
+    return json.loads(data)
 
-    unwindset_limits = []
-    for match in re.finditer(r"--unwindset\s+[^\s]+:(\d+)", text):
-        try:
-            unwindset_limits.append(int(match.group(1)))
-        except Exception:
-            continue
 
-    unwind_limits = []
-    for match in re.finditer(r"--unwind\s+(\d+)", text):
+def _json_dumps_line(row: Dict[str, Any]) -> bytes:
+    """Encode one JSONL row plus newline, using orjson when it is installed."""
+    if orjson is not None:
         try:
-            unwind_limits.append(int(match.group(1)))
-        except Exception:
-            continue
+            return orjson.dumps(row, option=orjson.OPT_APPEND_NEWLINE)
+        except TypeError:
+            pass
+    return (json.dumps(row) + "\n").encode("utf-8")
 
-    max_limit = None
-    if unwindset_limits or unwind_limits:
-        max_limit = max(unwindset_limits + unwind_limits)
 
-    return {
-        "custom_loop_limits": len(unwindset_limits),
-        "max_loop_limit": max_limit,
-    }
+def _section(obj: Dict[str, Any], key: str) -> Dict[str, Any]:
+    """obj[key] if it is a dict, else an empty dict (missing fields read as None)."""
+    value = obj.get(key)
+    return value if isinstance(value, dict) else {}
 
 
 def iter_metrics(path: Path) -> Iterable[Dict[str, Any]]:
-    with path.open("r", encoding="utf-8") as f:
+    # Lines stay bytes; both decoders accept UTF-8 bytes directly.
+    with path.open("rb") as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
             try:
-                yield json.loads(line)
+                yield _json_loads(line)
             except Exception:
                 continue
 
 
-def build_paper_row(metrics: Dict[str, Any], run_root: Optional[Path] = None) -> Dict[str, Any]:
+def build_paper_row(
+    metrics: Dict[str, Any],
+    run_root: Optional[Path] = None,
+    cache: Optional[ProofSummaryCache] = None,
+) -> Dict[str, Any]:
     proof_dir = metrics.get("proof_dir")
     function = metrics.get("function")
     effective_proof_dir = None
@@ -208,38 +82,44 @@ def build_paper_row(metrics: Dict[str, Any], run_root: Optional[Path] = None) ->
         if candidate.is_dir():
             effective_proof_dir = str(candidate)
 
-    coverage_path = _get_nested(metrics, "coverage", "coverage_path")
+    summary: Optional[ProofSummary] = None
+    proof_coverage_path = None
+    if effective_proof_dir:
+        proof_path = Path(effective_proof_dir)
+        summary = cache.summarize(proof_path) if cache is not None else summarize_proof_dir(proof_path)
+        proof_coverage_path = str(coverage_path_from_proof_dir(proof_path))
+
+    tokens = _section(metrics, "tokens")
+    costs = _section(metrics, "costs")
+    coverage = _section(metrics, "coverage")
+    overall = _section(coverage, "overall")
+    non_harness = _section(coverage, "non_harness")
+    verification = _section(metrics, "verification")
+
+    coverage_path = coverage.get("coverage_path")
     if coverage_path:
         if not Path(str(coverage_path)).is_file() and effective_proof_dir:
-            coverage_path = str(_coverage_path_from_proof_dir(effective_proof_dir))
+            coverage_path = proof_coverage_path
     elif effective_proof_dir:
-        coverage_path = str(_coverage_path_from_proof_dir(effective_proof_dir))
+        coverage_path = proof_coverage_path
 
     harness_size = None
     program_files = None
-    if coverage_path:
-        harness_size = _count_harness_size(Path(coverage_path))
-        program_files = _count_program_files(Path(coverage_path))
+    if summary is not None and coverage_path == proof_coverage_path:
+        harness_size = summary.harness_size
+        program_files = summary.program_files
+    elif coverage_path:
+        _hit, _total, harness_size, program_files = summarize_coverage(load_coverage(Path(coverage_path)))
 
     num_preconditions = None
     stubs = None
     custom_loop_limits = None
     max_loop_limit = None
-    if effective_proof_dir:
-        scope = _gather_scope_files(Path(effective_proof_dir))
-        scope_c = [p for p in scope if p.suffix.lower() == ".c"]
-        if scope_c:
-            num_preconditions = _count_preconditions(scope_c)
-        else:
-            num_preconditions = 0
-
-    if stubs is None and effective_proof_dir:
-        stubs = _count_harness_stub_functions_ctags(Path(effective_proof_dir))
-
-    if effective_proof_dir:
-        loop_limits = _parse_loop_limits(Path(effective_proof_dir))
-        custom_loop_limits = loop_limits.get("custom_loop_limits")
-        max_loop_limit = loop_limits.get("max_loop_limit")
+    if summary is not None:
+        num_preconditions = summary.num_preconditions
+        stubs = summary.stubs
+        custom_loop_limits = summary.custom_loop_limits
+        max_loop_limit = summary.max_loop_limit
 
     row = OrderedDict()
     row["function"] = function
@@ -255,27 +135,27 @@ def build_paper_row(metrics: Dict[str, Any], run_root: Optional[Path] = None) ->
     row["stubs"] = stubs
     row["custom_loop_limits"] = custom_loop_limits
     row["max_loop_limit"] = max_loop_limit
-    row["tokens.input_tokens"] = _get_nested(metrics, "tokens", "input_tokens")
-    row["tokens.cached_tokens"] = _get_nested(metrics, "tokens", "cached_tokens")
-    row["tokens.output_tokens"] = _get_nested(metrics, "tokens", "output_tokens")
-    row["tokens.reasoning_tokens"] = _get_nested(metrics, "tokens", "reasoning_tokens")
-    row["tokens.total_tokens"] = _get_nested(metrics, "tokens", "total_tokens")
-    row["costs.input_cost"] = _get_nested(metrics, "costs", "input_cost")
-    row["costs.output_cost"] = _get_nested(metrics, "costs", "output_cost")
-    row["costs.cached_cost"] = _get_nested(metrics, "costs", "cached_cost")
-    row["costs.reasoning_cost"] = _get_nested(metrics, "costs", "reasoning_cost")
-    row["costs.total_cost"] = _get_nested(metrics, "costs", "total_cost")
+    row["tokens.input_tokens"] = tokens.get("input_tokens")
+    row["tokens.cached_tokens"] = tokens.get("cached_tokens")
+    row["tokens.output_tokens"] = tokens.get("output_tokens")
+    row["tokens.reasoning_tokens"] = tokens.get("reasoning_tokens")
+    row["tokens.total_tokens"] = tokens.get("total_tokens")
+    row["costs.input_cost"] = costs.get("input_cost")
+    row["costs.output_cost"] = costs.get("output_cost")
+    row["costs.cached_cost"] = costs.get("cached_cost")
+    row["costs.reasoning_cost"] = costs.get("reasoning_cost")
+    row["costs.total_cost"] = costs.get("total_cost")
     row["coverage.coverage_path"] = coverage_path
-    row["coverage.overall.hit"] = _get_nested(metrics, "coverage", "overall", "hit")
-    row["coverage.overall.total"] = _get_nested(metrics, "coverage", "overall", "total")
-    row["coverage.overall.percentage"] = _get_nested(metrics, "coverage", "overall", "percentage")
-    row["coverage.non_harness.hit"] = _get_nested(metrics, "coverage", "non_harness", "hit")
-    row["coverage.non_harness.total"] = _get_nested(metrics, "coverage", "non_harness", "total")
-    row["coverage.non_harness.percentage"] = _get_nested(metrics, "coverage", "non_harness", "percentage")
+    row["coverage.overall.hit"] = overall.get("hit")
+    row["coverage.overall.total"] = overall.get("total")
+    row["coverage.overall.percentage"] = overall.get("percentage")
+    row["coverage.non_harness.hit"] = non_harness.get("hit")
+    row["coverage.non_harness.total"] = non_harness.get("total")
+    row["coverage.non_harness.percentage"] = non_harness.get("percentage")
     row["harness_size"] = harness_size
     row["program_files"] = program_files
-    row["verification.result_path"] = _get_nested(metrics, "verification", "result_path")
-    row["verification.error_count"] = _get_nested(metrics, "verification", "error_count")
+    row["verification.result_path"] = verification.get("result_path")
+    row["verification.error_count"] = verification.get("error_count")
     return row
 
 
@@ -363,20 +243,26 @@ def main() -> None:
             "verification.error_count",
         ]
 
-        with out_path.open("w", encoding="utf-8") as f:
+        cache = ProofSummaryCache(run_root) if ProofSummaryCache.enabled() else None
+        # Every CSV column is a key of the row, so rows project with one itemgetter call.
+        csv_values = operator.itemgetter(*csv_columns)
+        with out_path.open("wb", buffering=_IO_BUFFER_BYTES) as f:
             csv_file = None
             csv_writer = None
             if args.csv:
-                csv_file = csv_path.open("w", encoding="utf-8", newline="")
-                csv_writer = csv.DictWriter(csv_file, fieldnames=csv_columns)
-                csv_writer.writeheader()
+                csv_file = csv_path.open("w", encoding="utf-8", newline="", buffering=_IO_BUFFER_BYTES)
+                csv_writer = csv.writer(csv_file)
+                csv_writer.writerow(csv_columns)
+            write = f.write
             for m in iter_metrics(metrics_path):
-                row = build_paper_row(m, run_root=run_root)
-                f.write(json.dumps(row) + "\n")
+                row = build_paper_row(m, run_root=run_root, cache=cache)
+                write(_json_dumps_line(row))
                 if csv_writer:
-                    csv_writer.writerow({k: row.get(k) for k in csv_columns})
+                    csv_writer.writerow(csv_values(row))
             if csv_file:
                 csv_file.close()
+        if cache is not None:
+            cache.save()
 
         print(f"[codexup] wrote paper metrics: {out_path}")
         if args.csv: